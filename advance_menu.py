@@ -1,30 +1,37 @@
-import os
-import keyboard
+import asyncio
 from colorify import ConsoleStencil
-import time
+from terminal import FrameClock, FrameRenderer, KeyEvent, KeyInput, default_input
+from terminal import KEY_RESIZE, SESSION
+from option_filter import FuzzyMatcher, FuzzyView
 
 
 
 class Option:
+    SELECTED_STYLE = ConsoleStencil.compile(fg_color='black', bg_color='white', ansi='bold', style='bright')
+    UNSELECTED_STYLE = ConsoleStencil.compile(fg_color='white', bg_color='black', ansi='italic', style='dim')
+    SELECTED_CODES = ConsoleStencil.compile(padded=False, fg_color='black', bg_color='white', ansi='bold', style='bright').prefix
+    UNSELECTED_CODES = ConsoleStencil.compile(padded=False, fg_color='white', bg_color='black', ansi='italic', style='dim').prefix
+    MATCH_STYLE = ConsoleStencil.compile(padded=False, fg_color='yellow', ansi='underline')
+
     def __init__(self, title: str, mapping, icon: str = '') -> None:
         self.title: str = title
         self.icon: str = icon
         self.mapping = mapping
     
-    def show(self, is_selected: bool):
-        style = f'[ { self.icon } { self.title } ]'
+    def show(self, is_selected: bool, positions: tuple[int, ...] = ()):
+        title = self.title
+        if positions:
+            restore = Option.SELECTED_CODES if is_selected else Option.UNSELECTED_CODES
+            title = FuzzyMatcher.highlight(title, positions, Option.MATCH_STYLE, restore)
+        style = f'[ { self.icon } { title } ]'
         if is_selected:
-            return ConsoleStencil.multi_style(style, fg_color='black', 
-                    bg_color='white', ansi='bold', style='bright'
-            )
+            return Option.SELECTED_STYLE(style)
         else:
-            return ConsoleStencil.multi_style(style, fg_color='white', 
-                    bg_color='black', ansi='italic', style='dim'
-            )
+            return Option.UNSELECTED_STYLE(style)
 
 
 def clear() -> None:
-    os.system('cls' if os.name == 'nt' else 'clear')
+    SESSION.clear()
 
 def promptify(prompt: str) -> str:
     return ConsoleStencil.multi_style(f'[ < ? > {prompt} < ? > ]', ansi='bold', style='bright')
@@ -34,38 +41,98 @@ def navify(nav: str) -> str:
 
 
 class SingleMenu:
-    def __init__(self, options: list[Option], prompt: str) -> None:
+    def __init__(self, options: list[Option], prompt: str, fuzzy: bool = False) -> None:
+        '''
+            With fuzzy set typed characters fuzzy match the option
+            titles and only the best ranked options are shown.
+        '''
         self.options: list[Option] = options
         self.prompt: str = promptify(prompt)
         self.highlight: int = 0
         self.active: bool = False
+        self.screen: FrameRenderer = FrameRenderer(SESSION)
+        self.key_input: KeyInput = default_input()
+        self.frame_clock: FrameClock = FrameClock()
+        self.matcher: FuzzyMatcher = FuzzyMatcher(options, key=lambda option: option.title) if fuzzy else None
+        self.query: str = ''
+        self.matches: FuzzyView = None
 
+    @property
+    def view(self) -> list[Option]:
+        return self.matches if self.query else self.options
 
     def render(self) -> None:
-        clear()
-        print(f'{ self.prompt } - { navify("[ Move ↑ / ↓ ]") }')
-        for idx, item in enumerate(self.options):
-            print(item.show(idx == self.highlight))
+        rows = [f'{ self.prompt } - { navify("[ Move ↑ / ↓ ]") }']
+        if self.matcher:
+            rows[0] = f'{ rows[0] } { navify(f"Filter: { self.query }_") }'
+        for idx, item in enumerate(self.view):
+            positions = self.matches.positions[idx] if self.query else ()
+            rows.append(item.show(idx == self.highlight, positions))
+        self.screen.render(rows)
+
+    def handle_query_key(self, key: KeyEvent) -> bool:
+        if not self.matcher:
+            return False
+
+        if key.name == 'backspace':
+            self.query = self.query[:-1]
+
+        elif key.name == 'esc':
+            self.query = ''
+
+        elif key.name == 'space':
+            self.query = f'{ self.query } '
+
+        elif len(key.name) == 1:
+            self.query = f'{ self.query }{ key.name }'
+
+        else:
+            return False
+        self.matches = self.matcher.search(self.query) if self.query else None
+        self.highlight = 0
+        return True
+
+    def handle_keys(self, key: KeyEvent) -> None:
+        if self.handle_query_key(key):
+            return
 
-    def handle_keys(self, key: keyboard.KeyboardEvent) -> None:
         if key.name == 'up':
-            self.highlight = (self.highlight - 1) % len(self.options)
+            self.highlight = (self.highlight - 1) % max(1, len(self.view))
 
         elif key.name == 'down':
-            self.highlight = (self.highlight + 1) % len(self.options)
+            self.highlight = (self.highlight + 1) % max(1, len(self.view))
+
+        elif key.name == KEY_RESIZE:
+            self.screen.invalidate()
 
     def run(self) -> str:
         self.active = True
-        while self.active:
-            self.render()
-            key = keyboard.read_event()
-            if key.event_type != keyboard.KEY_DOWN:
-                continue
-            if key.name == 'enter':
-                break
-            self.handle_keys(key)
-            time.sleep(0.01)
-        return self.options[self.highlight]
+        with SESSION, self.key_input:
+            while self.active:
+                self.render()
+                self.frame_clock.tick()
+                for key in self.key_input.read_batch(self.frame_clock):
+                    if key.name == 'enter' and self.view:
+                        self.active = False
+                        break
+                    self.handle_keys(key)
+        return self.view[self.highlight]
+
+    async def run_async(self, timeout: float = None) -> Option:
+        return await asyncio.wait_for(self.__run_async(), timeout)
+
+    async def __run_async(self) -> Option:
+        self.active = True
+        with SESSION, self.key_input:
+            while self.active:
+                self.render()
+                self.frame_clock.tick()
+                for key in await self.key_input.read_batch_async(self.frame_clock):
+                    if key.name == 'enter' and self.view:
+                        self.active = False
+                        break
+                    self.handle_keys(key)
+        return self.view[self.highlight]
 
 
 class PagedMenu:
@@ -74,6 +141,9 @@ class PagedMenu:
         self.options = options
         self.prompt = promptify(prompt)
         self.running: bool = False
+        self.screen: FrameRenderer = FrameRenderer(SESSION)
+        self.key_input: KeyInput = default_input()
+        self.frame_clock: FrameClock = FrameClock()
         self.__setup_menu(page_size)
 
     def __setup_menu(self, page_size: int) -> None:
@@ -90,13 +160,13 @@ class PagedMenu:
 
     
     def render(self) -> None:
-        clear()
-        print(f'{self.prompt} - { navify("[ < i > Move ↑/↓  | Page ←/→ | Select Enter  < i > ]") }')
+        rows = [f'{self.prompt} - { navify("[ < i > Move ↑/↓  | Page ←/→ | Select Enter  < i > ]") }']
         for idx, option in enumerate(self.current_page_options):
-            print(option.show(idx == self.highlight))
+            rows.append(option.show(idx == self.highlight))
+        self.screen.render(rows)
 
 
-    def handle_keys(self, key: keyboard.KeyboardEvent) -> None:
+    def handle_keys(self, key: KeyEvent) -> None:
         if key.name == 'up':
             self.highlight = (self.highlight - 1) % len(self.current_page_options)
 
@@ -112,15 +182,34 @@ class PagedMenu:
         elif key.name == 'enter':
             self.running = False
 
+        elif key.name == KEY_RESIZE:
+            self.screen.invalidate()
+
     def run(self) -> str:
         self.running = True
-        while self.running:
-            self.render()
-            key = keyboard.read_event()
-            if key.event_type != keyboard.KEY_DOWN:
-                continue
-            self.handle_keys(key)
-            time.sleep(0.01)
+        with SESSION, self.key_input:
+            while self.running:
+                self.render()
+                self.frame_clock.tick()
+                for key in self.key_input.read_batch(self.frame_clock):
+                    self.handle_keys(key)
+                    if not self.running:
+                        break
+        return self.current_page_options[self.highlight]
+
+    async def run_async(self, timeout: float = None) -> Option:
+        return await asyncio.wait_for(self.__run_async(), timeout)
+
+    async def __run_async(self) -> Option:
+        self.running = True
+        with SESSION, self.key_input:
+            while self.running:
+                self.render()
+                self.frame_clock.tick()
+                for key in await self.key_input.read_batch_async(self.frame_clock):
+                    self.handle_keys(key)
+                    if not self.running:
+                        break
         return self.current_page_options[self.highlight]
 
     
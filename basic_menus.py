@@ -1,9 +1,15 @@
-import os
-import keyboard
-from colorify import ConsoleStencil
-import time 
-import msvcrt
-import sys 
+import asyncio
+import functools
+from colorify import ConsoleStencil, CompiledStyle
+from terminal import FrameClock, FrameRenderer, KeyEvent, KeyInput, TerminalSession, default_input
+from terminal import KEY_RESIZE, SESSION, terminal_size
+from option_sources import OptionSource, SequenceSource, StreamingSource
+from option_filter import FilterView, FuzzyMatcher, FuzzyView, PrefixIndex
+from collections.abc import Sequence
+
+NAV_STYLE: CompiledStyle = ConsoleStencil.compile(ansi='italic', style='dim')
+
+MATCH_STYLE: CompiledStyle = ConsoleStencil.compile(padded=False, fg_color='yellow', ansi='underline')
 
 class MenuError(Exception):
     '''
@@ -29,8 +35,8 @@ class InvalidPageSizeError(MenuError):
 
 
 class HorizontalSizeError(MenuError):
-    '''Raised when the number of options exceeds the screen width.'''
-    ERROR = "< ERROR > Horizontal Menus must have 6 or fewer options or they wont fit on the screen."
+    '''Raised when the options of a Horizontal Menu are wider than the screen.'''
+    ERROR = "< ERROR > Horizontal Menus must fit on one row of the screen, use fewer or shorter options."
 
 
 
@@ -49,6 +55,8 @@ class MenuStyle:
 
     DEFAULT_PROMPT: dict[str, str] = {'ansi': 'bold', 'style': 'bright'}
 
+    OPTION_CACHE_SIZE: int = 4096
+
     
     @staticmethod
     def create_default():
@@ -73,7 +81,7 @@ class MenuStyle:
             else:
                 print(f"[ ! ] WARNING: Invalid style { key }: '{ value }'. This style will be ignored.")
         return valid_style
-    
+
     def __init__(self, selected: dict[str, str], unselected: dict[str, str], prompt: dict[str, str]) -> None:
         '''
             With the use of the ConsoleStencil Class you can create your own custom
@@ -97,6 +105,7 @@ class MenuStyle:
         self.unselected_style: dict = MenuStyle.validate_style(unselected)
         self.prompt_style: dict = MenuStyle.validate_style(prompt)
         self.__apply_default()
+        self.__compile()
     
     def __apply_default(self) -> None:
         '''
@@ -112,24 +121,48 @@ class MenuStyle:
 
         if not self.prompt_style:
             self.prompt_style = MenuStyle.DEFAULT_PROMPT
+
+    def __compile(self) -> None:
+        '''
+            Compiles the style dictionaries into prefix / suffix pairs and sets up
+            the bounded LRU cache of rendered options, after the first frame a 
+            repaint does no style work at all.
+        '''
+        self.selected_compiled: CompiledStyle = ConsoleStencil.compile(**self.selected_style)
+        self.unselected_compiled: CompiledStyle = ConsoleStencil.compile(**self.unselected_style)
+        self.prompt_compiled: CompiledStyle = ConsoleStencil.compile(**self.prompt_style)
+        self.selected_codes: str = ConsoleStencil.compile(padded=False, **self.selected_style).prefix
+        self.unselected_codes: str = ConsoleStencil.compile(padded=False, **self.unselected_style).prefix
+        self.render_option = functools.lru_cache(maxsize=MenuStyle.OPTION_CACHE_SIZE)(
+            self.__render_option
+        )
+        self.render_prompt = functools.lru_cache(maxsize=8)(self.__render_prompt)
+
+    def __render_option(self, option: str, is_selected: bool) -> str:
+        if is_selected:
+            return self.selected_compiled(f'⇒ [ { option } ] ⇐')
+        return self.unselected_compiled(f'[ { option } ]')
+
+    def __render_prompt(self, prompt: str) -> str:
+        return self.prompt_compiled(f'[ < ? > { prompt } < ? > ]')
     
     def apply_option_style(self, option: str, is_selected: bool) -> str:
-        option = f'[ { option } ]'
-        if is_selected:
-            option = f'⇒ { option } ⇐'
-            stylized = self.selected_style
-        else:
-            stylized = self.unselected_style
-            
-        return ConsoleStencil.multi_style(option, **stylized)
+        return self.render_option(option, is_selected)
     
     def prompt_stylize(self, prompt: str) -> str:
-        prompt = f'[ < ? > { prompt } < ? > ]'
-        return ConsoleStencil.multi_style(prompt, **self.prompt_style)
+        return self.render_prompt(prompt)
 
 class BaseMenu:
-    def __init__(self, options: list[str], prompt: str, menu_style: MenuStyle = None) -> None:
-        if len(options) == 0:
+    # renders are capped at this rate, keys arriving in between are applied without drawing
+    MAX_FPS: int = FrameClock.DEFAULT_FPS
+
+    def __init__(self, options: list[str], prompt: str, menu_style: MenuStyle = None, 
+    session: TerminalSession = None) -> None:
+        '''
+            Menus share the terminal SESSION unless a session is passed, so a menu
+            opened while another one is running nests inside it.
+        '''
+        if not options:
             raise EmptyMenuError(EmptyMenuError.ERROR)
 
         self.options: list[str] = options
@@ -137,9 +170,104 @@ class BaseMenu:
         self.highlight: int = 0
         self.active: bool = False
         self.menu_style: MenuStyle = menu_style if menu_style else MenuStyle.create_default()        
+        self.session: TerminalSession = session if session else SESSION
+        self.screen: FrameRenderer = FrameRenderer(self.session)
+        self.key_input: KeyInput = default_input()
+        self.frame_clock: FrameClock = FrameClock(BaseMenu.MAX_FPS)
+        self.option_filter: PrefixIndex = None
+        self.filtered: FilterView = None
+        self.query: str = ''
     
     def clear(self) -> None:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.session.clear()
+
+    @property
+    def view(self) -> Sequence[str]:
+        '''
+            The options currently shown, the filtered 
+            view while a filter query is typed.
+        '''
+        return self.filtered if self.query else self.options
+
+    def enable_filter(self, options: Sequence[str], fuzzy: bool = False) -> None:
+        '''
+            Builds the index used for type-ahead filtering, typed characters
+            narrow the options shown to the ones starting with the query or, 
+            when fuzzy is True, to the best fuzzy matches ranked by score.
+        '''
+        self.option_filter = FuzzyMatcher(options) if fuzzy else PrefixIndex(options)
+
+    def set_query(self, query: str) -> None:
+        self.query = query
+        self.filtered = self.option_filter.search(query) if query else None
+        self.highlight = 0
+        self.on_view_change()
+
+    def on_view_change(self) -> None:
+        '''
+            Called after the filter query changed, subclasses reset
+            their scroll / paging state here.
+        '''
+        pass
+
+    def handle_filter_key(self, key) -> bool:
+        '''
+            Updates the filter query from a typed character, backspace or
+            escape (clears the query). Returns True if the key was consumed.
+        '''
+        if not self.option_filter:
+            return False
+
+        if key.name == 'backspace':
+            self.set_query(self.query[:-1])
+
+        elif key.name == 'esc':
+            self.set_query('')
+
+        elif key.name == 'space':
+            self.set_query(f'{ self.query } ')
+
+        elif len(key.name) == 1:
+            self.set_query(f'{ self.query }{ key.name }')
+
+        else:
+            return False
+        return True
+
+    @property
+    def loading(self) -> bool:
+        '''
+            True while streamed options are still arriving.
+        '''
+        return isinstance(self.options, OptionSource) and self.options.loading
+
+    def refresh_timeout(self) -> float:
+        '''
+            How long to wait for a key before repainting anyway, 
+            None (wait for a key) unless options are loading.
+        '''
+        return StreamingSource.REFRESH_INTERVAL if self.loading else None
+
+    def loading_text(self) -> str:
+        if not self.loading:
+            return ''
+        return NAV_STYLE(f'[ loading { self.options.count() }... ]')
+
+    def filter_text(self) -> str:
+        if not self.option_filter:
+            return ''
+        matches = self.filtered.total if isinstance(self.filtered, FuzzyView) else len(self.view)
+        return NAV_STYLE(f'[ Filter: { self.query }_ ({ matches } matches) ]')
+
+    def style_option(self, idx: int, option: str, is_selected: bool) -> str:
+        '''
+            Styles the option at index idx of the view, highlighting 
+            the characters matched by a fuzzy query.
+        '''
+        if self.query and isinstance(self.filtered, FuzzyView):
+            restore = self.menu_style.selected_codes if is_selected else self.menu_style.unselected_codes
+            option = FuzzyMatcher.highlight(option, self.filtered.positions[idx], MATCH_STYLE, restore)
+        return self.menu_style.apply_option_style(option, is_selected)
 
     def set_menu_style(self, selected: dict[str, str], unselected: dict[str, str], prompt: dict[str, str]) -> None:
         '''
@@ -163,8 +291,22 @@ class BaseMenu:
         self.menu_style = MenuStyle(selected, unselected, prompt)
         
     def show(self) -> None:
+        '''
+            Renders the frame built by the subclass, only the rows that changed
+            since the last frame are written to the console.
+        '''
+        self.screen.render(self.build_frame())
+
+    def build_frame(self) -> list[str]:
         raise NotImplementedError('ERROR: Called on Base Class, Subclasses must implement this method')
 
+    def set_max_fps(self, max_fps: int) -> None:
+        '''
+            Sets the maximum number of frames rendered per second, 0 or None 
+            renders after every batch of keys.
+        '''
+        self.frame_clock = FrameClock(max_fps)
+
     def run(self) -> str:
         '''
             Menu UI Loop that returns the option selected 
@@ -172,49 +314,147 @@ class BaseMenu:
             
             The menu is controlled by the 'active' attribute which is set to True upon method call
             when the menu is running. The loop will continue to run until the user presses the 'enter'
-            
+
+            Every key pressed since the last frame is applied before the next one is
+            rendered, so holding down a key never leaves the menu lagging behind.
+        '''
+        self.active = True
+        with self.session, self.key_input:
+            while self.active:
+                self.show()
+                self.frame_clock.tick()
+                self.apply_keys(self.key_input.read_batch(self.frame_clock, self.refresh_timeout()))
+        return self.selection()
+
+    async def run_async(self, timeout: float = None) -> str:
         '''
+            Awaitable version of run() for asyncio applications, the event loop
+            keeps running other tasks while the menu waits for keys.
+
+            Cancelling the task restores the terminal. When timeout (seconds) 
+            runs out before an option is selected asyncio.TimeoutError is raised.
+        '''
+        return await asyncio.wait_for(self.__run_async(), timeout)
+
+    async def __run_async(self) -> str:
         self.active = True
-        while self.active:
-            self.show()
-            key = keyboard.read_event()
-            if key.event_type != keyboard.KEY_DOWN:
-                continue
-            if key.name == 'enter':
+        with self.session, self.key_input:
+            while self.active:
+                self.show()
+                self.frame_clock.tick()
+                self.apply_keys(await self.key_input.read_batch_async(self.frame_clock, self.refresh_timeout()))
+        return self.selection()
+
+    def apply_keys(self, keys: list[KeyEvent]) -> None:
+        '''
+            Applies a batch of keys in order, the keys after the one 
+            that selected an option or closed the menu are dropped.
+        '''
+        for key in keys:
+            if key.name == KEY_RESIZE:
+                self.on_resize()
+            elif key.name == 'enter' and self.can_select():
+                self.active = False
+            else:
+                self.handle_keys(key)
+
+            if not self.active:
                 break
-            self.handle_keys(key)
-            time.sleep(0.01)
-        return self.options[self.highlight]
+
+    def on_resize(self) -> None:
+        '''
+            Called after the terminal was resized, the next frame is a full 
+            repaint. Subclasses drop layouts computed for the old size here.
+        '''
+        self.screen.invalidate()
+
+    def can_select(self) -> bool:
+        return len(self.view) > 0
+
+    def selection(self) -> str:
+        return self.view[self.highlight]
 
     def handle_keys(self, key) -> None:
         raise NotImplementedError('ERROR: Called on Base Class, Subclasses must implement this method')
 
     def move_down(self) -> None:
-        self.highlight = (self.highlight + 1) % len(self.options)
+        self.highlight = (self.highlight + 1) % max(1, len(self.view))
     
     def move_up(self) -> None:
-        self.highlight = (self.highlight - 1) % len(self.options)
+        self.highlight = (self.highlight - 1) % max(1, len(self.view))
     
     def exit_ui(self) -> None:
         self.active = False
 
 class VerticalMenu(BaseMenu):
+    # rows used by the title and the row the cursor is parked on
+    RESERVED_ROWS: int = 2
+
+    def __init__(self, options: list[str], prompt: str, menu_style: MenuStyle = None, 
+    max_rows: int = None, filterable: bool = False, fuzzy: bool = False, session: TerminalSession = None) -> None:
+        '''
+            Only the options inside the viewport are styled and rendered, the viewport
+            sizes itself from the terminal height (or max_rows when given) and scrolls
+            to keep the highlight in view so each keypress costs O(screen height) no
+            matter how many options the menu has.
+
+            When filterable is True typed characters filter the options by prefix, 
+            with fuzzy set they are fuzzy matched and ranked instead.
+
+            The options can also be an iterator or async iterator, the menu is then
+            usable right away and grows as the options arrive (filtering needs all
+            of the options up front).
+        '''
+        if StreamingSource.accepts(options):
+            if filterable or fuzzy:
+                raise ValueError("[ ERROR ] Filtering a menu requires a sequence of options.")
+            options = StreamingSource(options)
+        super().__init__(options, prompt, menu_style, session)
+        self.max_rows: int = max_rows
+        self.scroll_offset: int = 0
+        if filterable or fuzzy:
+            self.enable_filter(options, fuzzy)
+
+    @property
+    def viewport_rows(self) -> int:
+        if self.max_rows:
+            return self.max_rows
+        return max(1, terminal_size().lines - VerticalMenu.RESERVED_ROWS)
+
+    def __scroll_into_view(self, rows: int) -> None:
+        if self.highlight < self.scroll_offset:
+            self.scroll_offset = self.highlight
+
+        elif self.highlight >= self.scroll_offset + rows:
+            self.scroll_offset = self.highlight - rows + 1
+
+        self.scroll_offset = max(0, min(self.scroll_offset, len(self.view) - rows))
+
+    def on_view_change(self) -> None:
+        self.scroll_offset = 0
     
-    def __title_text(self) -> None: 
-        nav_txt = ConsoleStencil.multi_style(
-            f'[ Move ↑ / ↓ ]', ansi='italic', style='dim'
-        )
+    def __title_text(self) -> str: 
+        nav_txt = NAV_STYLE('[ Move ↑ / ↓ ]')
         prompt = self.menu_style.prompt_stylize(self.prompt)
-        print(f'{ prompt } - { nav_txt }') 
+        title = f'{ prompt } - { nav_txt } { self.filter_text() } { self.loading_text() }'.rstrip()
+        if len(self.view) <= self.viewport_rows:
+            return title
+        return f'{ title } [ { self.highlight + 1 } / { len(self.view) } ]'
     
-    def show(self) -> None:
-        self.clear()
-        self.__title_text()
-        for idx, item in enumerate(self.options):
-            option = self.menu_style.apply_option_style(item, idx == self.highlight)
-            print(option)
+    def build_frame(self) -> list[str]:
+        view = self.view
+        viewport_rows = self.viewport_rows
+        self.__scroll_into_view(viewport_rows)
+        end = min(len(view), self.scroll_offset + viewport_rows)
+        rows = [self.__title_text()]
+        for idx in range(self.scroll_offset, end):
+            rows.append(self.style_option(idx, view[idx], idx == self.highlight))
+        return rows
                 
-    def handle_keys(self, key: keyboard.KeyboardEvent) -> None:
+    def handle_keys(self, key: KeyEvent) -> None:
+        if self.handle_filter_key(key):
+            return
+
         if key.name == 'up':
             self.move_up()
             
@@ -224,22 +464,42 @@ class VerticalMenu(BaseMenu):
 
 
 class HorizontalMenu(BaseMenu):
-    def __init__(self, options: list[str], prompt: str, menu_style: MenuStyle = None) -> None:
-        super().__init__(options, prompt, menu_style)
-        if len(options) > 6:
-            raise HorizontalSizeError('ERROR: Horizontal Menus must have 6 or fewer options or they wont fit on the screen')
+    # the options are joined by this on a single row
+    SEPARATOR: str = '  '
+
+    def __init__(self, options: list[str], prompt: str, menu_style: MenuStyle = None, 
+    session: TerminalSession = None) -> None:
+        '''
+            All of the options are shown on a single row, the menu can have as
+            many options as fit in the width of the terminal with any of them
+            highlighted.
+        '''
+        super().__init__(options, prompt, menu_style, session)
+        if self.row_width() > terminal_size().columns:
+            raise HorizontalSizeError(HorizontalSizeError.ERROR)
         self.active = False
         self.highlight = 0
+
+    def row_width(self) -> int:
+        '''
+            The display width of the option row when its widest option is 
+            highlighted, escape codes and the ⇒ ⇐ markers are measured by
+            ConsoleStencil.visible_width().
+        '''
+        apply_style, visible_width = self.menu_style.apply_option_style, ConsoleStencil.visible_width
+        unselected = [visible_width(apply_style(option, False)) for option in self.options]
+        growth = max(visible_width(apply_style(option, True)) - width for option, width in zip(self.options, unselected))
+        return sum(unselected) + growth + len(HorizontalMenu.SEPARATOR) * (len(unselected) - 1)
     
-    def show(self):
-        self.clear()
+    def build_frame(self) -> list[str]:
         prompt = self.menu_style.prompt_stylize(self.prompt)
-        print(prompt)
-        for idx, item in enumerate(self.options):
+        options = [
             self.menu_style.apply_option_style(item, idx == self.highlight)
-        print()
+            for idx, item in enumerate(self.options)
+        ]
+        return [prompt, HorizontalMenu.SEPARATOR.join(options)]
         
-    def handle_keys(self, key: keyboard.KeyboardEvent) -> None:
+    def handle_keys(self, key: KeyEvent) -> None:
         if key.name == 'left':
             self.move_up()
         elif key.name == 'right':
@@ -249,12 +509,28 @@ class HorizontalMenu(BaseMenu):
 class PagedMenu(BaseMenu):
     NAV_GUIDE = "\t[ < i > Move ↑/↓  | Page ←/→ | Select Enter  < i > ]"
 
-    def __init__(self, options: list[str], prompt: str, menu_style: MenuStyle = None, 
-    page_size: int = 3):
-        self.__guard_ctor(page_size, options)
-        super().__init__(options, prompt, menu_style)
-        self.running: bool = False
+    def __init__(self, options: list[str] | OptionSource, prompt: str, menu_style: MenuStyle = None, 
+    page_size: int = 3, filterable: bool = False, fuzzy: bool = False, session: TerminalSession = None):
+        '''
+            The options can be a list, any sequence-like object, an OptionSource or
+            a provider with a get_page(index, size) method (and optionally count())
+            or a get_page(index, size) callable. Pages are fetched when they are 
+            shown and only a few of them are kept in memory.
+
+            When filterable is True typed characters filter the options by prefix (or
+            are fuzzy matched with fuzzy set) and the paging follows the filtered view,
+            this needs a sequence of options.
+
+            An iterator or async iterator is streamed in the background, the pages
+            fill up and the page count grows while the options load.
+        '''
+        source = OptionSource.wrap(options)
+        self.__guard_ctor(page_size, source)
+        super().__init__(source, prompt, menu_style, session)
+        self.filtered_source: SequenceSource = None
         self.__setup_menu(page_size)
+        if filterable or fuzzy:
+            self.__setup_filter(fuzzy)
         
     def __setup_menu(self, page_size: int) -> None:
         '''
@@ -262,16 +538,52 @@ class PagedMenu(BaseMenu):
             for the paged menu to function correctly
         '''
         self.page_size: int = page_size
-        self.total_pages: int = (len(self.options) + page_size - 1) // page_size
         self.current_page: int = 1
         self.highlight: int = 0
         
-    def __guard_ctor(self, page_size: int, options: list) -> None:
+    def __guard_ctor(self, page_size: int, source: OptionSource) -> None:
         if page_size <= 0:
             raise ValueError("[ ERROR ] Page size must be greater than zero.")
-        if page_size > len(options):
+        count = source.count()
+        if count is not None and not source.loading and page_size > count:
             raise InvalidPageSizeError(InvalidPageSizeError.ERROR)
 
+    def __setup_filter(self, fuzzy: bool) -> None:
+        if not isinstance(self.options, SequenceSource):
+            raise ValueError("[ ERROR ] Filtering a PagedMenu requires a sequence of options.")
+        self.enable_filter(self.options.options, fuzzy)
+
+    def on_view_change(self) -> None:
+        self.filtered_source = SequenceSource(self.filtered) if self.query else None
+        self.current_page = 1
+
+    @property
+    def running(self) -> bool:
+        return self.active
+
+    @running.setter
+    def running(self, value: bool) -> None:
+        self.active = value
+
+    @property
+    def page_source(self) -> OptionSource:
+        '''
+            The source the pages are read from, the filtered 
+            view while a filter query is typed.
+        '''
+        return self.filtered_source if self.query else self.options
+
+    @property
+    def total_pages(self) -> int:
+        '''
+            The number of pages or None while the end of 
+            a source without a count has not been reached.
+        '''
+        count = self.page_source.count()
+        if count is None:
+            return None
+        return (count + self.page_size - 1) // self.page_size
+
     @property
     def current_page(self) -> int:
         return self._current_page
@@ -279,12 +591,19 @@ class PagedMenu(BaseMenu):
     @current_page.setter
     def current_page(self, value: int) -> None:
         ''''
-            Allows the current page to bounce on first and last 
+            Allows the current page to bounce on first and last, when the
+            number of pages is unknown moving past the end bounces to the 
+            first page once an empty page is fetched. While options are 
+            loading the last loaded page doesn't bounce.
         '''
+        total_pages = self.total_pages
         if value < 1:
-            self._current_page = self.total_pages
+            self._current_page = total_pages if total_pages else 1
+
+        elif total_pages is not None and value > total_pages:
+            self._current_page = max(1, total_pages) if self.page_source.loading else 1
 
-        elif value > self.total_pages:
+        elif total_pages is None and not self.page_source.get_page(value - 1, self.page_size):
             self._current_page = 1
 
         else:
@@ -295,44 +614,49 @@ class PagedMenu(BaseMenu):
     @property
     def current_page_options(self) -> list[str]:
         '''
-            Refreshes the items on each page 
+            The items on the current page, served from
+            the source's page cache after the first read.
         '''
-        start = (self.current_page - 1) * self.page_size
-        end = start + self.page_size
-        return self.options[start: end]
+        return self.page_source.get_page(self.current_page - 1, self.page_size)
 
-    def __title_text(self) -> None:
-        nav_txt = ConsoleStencil.multi_style(
-            f'\n{ self.NAV_GUIDE }\n', ansi='italic', style='dim'
-        )
+    def __title_text(self) -> list[str]:
+        nav_txt = NAV_STYLE(self.NAV_GUIDE)
         prompt_txt = self.menu_style.prompt_stylize(self.prompt)
-        print(
-        f'{ nav_txt }{ prompt_txt } - [ Page { self.current_page } / { self.total_pages } ]\n'
-        )
+        total_pages = self.total_pages or "?"
+        if self.page_source.loading:
+            total_pages = f'{ total_pages }+'
+        return [
+            '', nav_txt, 
+            f'{ prompt_txt } - [ Page { self.current_page } / { total_pages } ] { self.filter_text() } { self.loading_text() }', ''
+        ]
         
-    def show(self) -> None:
+    def build_frame(self) -> list[str]:
         '''
-            Displays the UI in the Console highlighting
-            the currently selected option.
+            Builds the UI highlighting the currently 
+            selected option.
         '''
-        self.clear()
-        self.__title_text()
+        rows = self.__title_text()
+        page_start = (self.current_page - 1) * self.page_size
         for idx, option in enumerate(self.current_page_options):
-            opt = self.menu_style.apply_option_style(option, idx == self.highlight)
-            print(opt)
-        print('*' * 100)
+            rows.append(self.style_option(page_start + idx, option, idx == self.highlight))
+        rows.append('*' * 100)
+        return rows
 
-    def handle_keys(self, key: keyboard.KeyboardEvent) -> None:
+    def handle_keys(self, key: KeyEvent) -> None:
         '''
             Handles user keyboard input and manipulates list of
             options; properties handle the 'bouncing' allowing 
             last and first pages to seemlessly transition.
         '''
+        if self.handle_filter_key(key):
+            return
+
+        page_length = max(1, len(self.current_page_options))
         if key.name == 'up':
-            self.highlight = (self.highlight - 1) % len(self.current_page_options)
+            self.highlight = (self.highlight - 1) % page_length
 
         elif key.name == 'down':
-            self.highlight = (self.highlight + 1) % len(self.current_page_options)
+            self.highlight = (self.highlight + 1) % page_length
 
         elif key.name == 'left':
             self.current_page -= 1
@@ -340,19 +664,10 @@ class PagedMenu(BaseMenu):
         elif key.name == 'right':
             self.current_page += 1
 
-        elif key.name == 'enter':
-            self.running = False
-    
+    def can_select(self) -> bool:
+        return len(self.current_page_options) > 0
 
-    def run(self) -> str:
-        self.running = True
-        while self.running:
-            self.show()
-            key = keyboard.read_event()
-            if key.event_type != keyboard.KEY_DOWN:
-                continue
-            self.handle_keys(key)
-            time.sleep(0.01)
+    def selection(self) -> str:
         return self.current_page_options[self.highlight]
 
 
@@ -369,6 +684,8 @@ class CharMenuStyle:
     def __init__(self, option_style: dict[str, str] = {}, prompt_style: dict[str, str] = {}) -> None:
         self.option_style = self.__stylize(option_style)
         self.prompt_style = self.__stylize(prompt_style)
+        self.option_compiled: CompiledStyle = ConsoleStencil.compile(**self.option_style)
+        self.prompt_compiled: CompiledStyle = ConsoleStencil.compile(**self.prompt_style)
     
     def __stylize(self, styling: dict[str,str]) -> None:
         styling = MenuStyle.validate_style(styling)
@@ -379,17 +696,17 @@ class CharMenuStyle:
         return CharMenuStyle(CharMenuStyle.OPTION_DEFAULT, CharMenuStyle.PROMPT_DEFAULT)
     
     def apply_option(self, option: str) -> str:
-        return ConsoleStencil.multi_style(option, **self.option_style)
+        return self.option_compiled(option)
     
     def apply_prompt(self, prompt: str) -> str:
-        return ConsoleStencil.multi_style(prompt, **self.prompt_style)
+        return self.prompt_compiled(prompt)
 
 
 
         
 class CharMenu:
     def __init__(self, key_map: dict[str, str], prompt: str, 
-    option_style: CharMenuStyle = None, is_horizontal: bool = False) -> None:
+    option_style: CharMenuStyle = None, is_horizontal: bool = False, session: TerminalSession = None) -> None:
         '''
             Args:
                 key_map (dict[str, str]): A dictionary mapping keys to options
@@ -403,41 +720,54 @@ class CharMenu:
         self.prompt: str = prompt
         self.style: CharMenuStyle = option_style if option_style else CharMenuStyle.create_default()
         self.sep = '    ' if is_horizontal else '\n'
+        self.session: TerminalSession = session if session else SESSION
+        self.screen: FrameRenderer = FrameRenderer(self.session)
+        self.key_input: KeyInput = default_input()
         
         
     def __read_key(self) -> str:
         '''
             Reads a single key without the need for the user to press enter
-            built for both Unix and Windows 
+            using the menu's input backend.
         '''
-        if os.name == 'nt':
-            return msvcrt.getch().decode('utf-8')
-        else:
-            return self.__unix_read_key()
-    
-    def __unix_read_key(self) -> str:
-        import termios
-        import tty
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch.encode('utf-8')
+        name = self.key_input.read_key().name
+        if name == KEY_RESIZE:
+            self.screen.invalidate()
+        return ' ' if name == 'space' else name
 
     def show(self) -> None:
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print(self.style.apply_prompt(f'[ < ? > {self.prompt} < ? > ]'))
-        for key, value in self.key_map.items():
-            print(self.style.apply_option(f'[ {key} ] - {value}'), end=self.sep)
+        prompt = self.style.apply_prompt(f'[ < ? > {self.prompt} < ? > ]')
+        options = self.sep.join(
+            self.style.apply_option(f'[ {key} ] - {value}') for key, value in self.key_map.items()
+        )
+        self.screen.render([prompt, options])
             
     def run(self) -> str:
         key = None
-        while not key in self.key_map.keys():
-            self.show()
-            key = self.__read_key()
+        with self.session, self.key_input:
+            while not key in self.key_map.keys():
+                self.show()
+                key = self.__read_key()
+        return self.key_map[key]
+
+    async def run_async(self, timeout: float = None) -> str:
+        '''
+            Awaitable version of run(), raises asyncio.TimeoutError when 
+            timeout (seconds) runs out before a mapped key is pressed.
+        '''
+        return await asyncio.wait_for(self.__run_async(), timeout)
+
+    async def __run_async(self) -> str:
+        key = None
+        with self.session, self.key_input:
+            while not key in self.key_map.keys():
+                self.show()
+                for event in await self.key_input.read_keys_async():
+                    if event.name == KEY_RESIZE:
+                        self.screen.invalidate()
+                    key = ' ' if event.name == 'space' else event.name
+                    if key in self.key_map:
+                        break
         return self.key_map[key]
     
 
@@ -500,10 +830,9 @@ def test_horizontal_menu():
 
     # Error Handling - Too Many Options
     try:
-        many_options = ["Home", "Shop", "About",
-                        "Contact", "Blog", "FAQ", "Careers"]
+        many_options = [f"Section { i }" for i in range(100)]
         menu = HorizontalMenu(many_options, "Too Many Options")
-    except ValueError as e:
+    except HorizontalSizeError as e:
         print(f"Caught error: {e}\n")
 
     # Error Handling - Empty Options List
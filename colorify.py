@@ -1,7 +1,38 @@
 from colorama import Fore, Back, Style, init
+import functools
 import re 
+import unicodedata
 
 init(autoreset=True)
+
+
+class CompiledStyle:
+    '''
+        A style that was validated and assembled once by ConsoleStencil.compile(),
+        applying it to text is a single string concatenation of the precomputed
+        prefix and suffix.
+
+        prefix: str: The escape codes written before the text.
+
+        suffix: str: The escape codes written after the text.
+
+        valid: bool: False if any of the keyword arguments compiled were invalid 
+        and ignored.
+    '''
+    __slots__ = ('prefix', 'suffix', 'valid')
+
+    def __init__(self, prefix: str = '', suffix: str = '', valid: bool = True) -> None:
+        self.prefix: str = prefix
+        self.suffix: str = suffix
+        self.valid: bool = valid
+
+    def __call__(self, text: str) -> str:
+        return f'{ self.prefix }{ text }{ self.suffix }'
+
+    def __repr__(self) -> str:
+        return f'CompiledStyle(prefix={ self.prefix !r}, suffix={ self.suffix !r})'
+
+
 class ConsoleStencil:
     '''
         A collection of static methods for applying color and style to text in the console.
@@ -26,6 +57,29 @@ class ConsoleStencil:
         
         ANSI_STYLE_MAP: dict[str, str]: A dictionary mapping ANSI style names to their respective
         ANSI escape codes.
+
+        RAINBOW_COLORS: tuple[str, ...]: The order rainbow() and gradient() cycle through colors in.
+
+        STREAM_CHUNK_SIZE: int: Roughly how many characters color_regex_stream() colors at a time.
+
+        SCOPED_FLAGS: tuple[tuple[int, str], ...]: The regex flags that are kept as inline flags
+        when color_regex_stream() combines patterns.
+
+        GLOBAL_FLAGS: re.Pattern: Matches the inline flags at the start of a pattern, which
+        are moved into a scoped group when patterns are combined.
+
+        GROUP_REFERENCE: re.Pattern: Matches numbered backreferences and conditionals, 
+        patterns using them are not combined since their groups would be renumbered.
+
+        WIDTH_CACHE_SIZE: int: The number of strings whose visible width, truncation and
+        padding are memoized.
+
+        ESCAPE_PATTERN: re.Pattern: Matches the escape sequences (SGR codes, cursor movement)
+        that take up no columns on the screen.
+
+        CONTROL_PATTERN: re.Pattern: Matches the control characters sanitize() removes or expands.
+
+        TAB_SIZE: int: The distance between tab stops.
     '''
     
     
@@ -47,6 +101,103 @@ class ConsoleStencil:
         'italic': '\033[3m',
         'normal': '\033[0m'
     }
+
+    RAINBOW_COLORS: tuple[str, ...] = ('red', 'yellow', 'green', 'cyan', 'blue', 'magenta')
+
+    COMPILED_CACHE_SIZE: int = 256
+
+    STREAM_CHUNK_SIZE: int = 1 << 20
+
+    SCOPED_FLAGS: tuple[tuple[int, str], ...] = (
+        (re.ASCII, 'a'),
+        (re.IGNORECASE, 'i'),
+        (re.MULTILINE, 'm'),
+        (re.DOTALL, 's'),
+        (re.VERBOSE, 'x')
+    )
+
+    GLOBAL_FLAGS: re.Pattern = re.compile(r'^(?:\(\?[aiLmsux]+\))+')
+
+    GROUP_REFERENCE: re.Pattern = re.compile(r'(?<!\\)(?:\\\\)*\\(?:[1-9]|g<\d)|\(\?\(\d')
+
+    WIDTH_CACHE_SIZE: int = 4096
+
+    ESCAPE_PATTERN: re.Pattern = re.compile(r'(\x1b\[[0-?]*[ -/]*[@-~])')
+
+    CONTROL_PATTERN: re.Pattern = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+
+    TAB_SIZE: int = 8
+
+    _COMPILED: dict[tuple, CompiledStyle] = {}
+
+    @staticmethod
+    def _log_error(message: str) -> None:
+        print(f"[ ! ] WARNING: { message }")
+
+    @staticmethod
+    def compile(padded: bool = True, reset: bool = True, quiet: bool = False, **kwargs) -> CompiledStyle:
+        """
+            Validates the style keyword arguments once and returns a CompiledStyle 
+            that can be called on any number of strings, the result is identical to 
+            ConsoleStencil.multi_style(text, **kwargs) without redoing the work.
+
+            Compiled styles are cached so compiling the same style again is a lookup 
+            and invalid arguments are only reported once.
+
+            Keyword Args:
+                ansi (str, optional): The text style such as 'bold', 'underline', etc.
+
+                fg_color (str, optional): The foreground color.
+
+                bg_color (str, optional): The background color.
+
+                style (str, optional): The colorama style such as 'bright', 'dim', etc.
+
+                padded (bool): If False the codes are not separated from the text by spaces.
+
+                reset (bool): If False the suffix does not end with Style.RESET_ALL.
+
+                quiet (bool): If True invalid arguments are ignored without a warning.
+
+            Returns:
+                CompiledStyle: The precompiled style.
+        """
+        key = (padded, reset, quiet, *kwargs.items())
+        compiled = ConsoleStencil._COMPILED.get(key)
+        if compiled is None:
+            if len(ConsoleStencil._COMPILED) >= ConsoleStencil.COMPILED_CACHE_SIZE:
+                ConsoleStencil._COMPILED.clear()
+            compiled = ConsoleStencil._build(kwargs.items(), padded, reset, quiet)
+            ConsoleStencil._COMPILED[key] = compiled
+        return compiled
+
+    @staticmethod
+    def _build(items, padded: bool, reset: bool, quiet: bool) -> CompiledStyle:
+        pad = ' ' if padded else ''
+        prefix, suffix, valid = '', '', True
+        for key, value in items:
+            value = value.lower()
+            if key == 'fg_color' and value in ConsoleStencil.VALID_COLORS:
+                prefix = f"{ ConsoleStencil.COLOR_MAP[value] }{ pad }{ prefix }"
+                
+            elif key == 'bg_color' and value in ConsoleStencil.VALID_COLORS:
+                prefix = f"{ ConsoleStencil.BACKGROUND_MAP[value] }{ pad }{ prefix }"
+                
+            elif key == 'ansi' and value in ConsoleStencil.VALID_ANSI_STYLES:
+                prefix = f"{ ConsoleStencil.ANSI_STYLE_MAP[value] }{ pad }{ prefix }"
+                suffix = f"{ suffix }{ pad }{ ConsoleStencil.ANSI_STYLE_MAP['normal'] }"
+                
+            elif key == 'style' and value in ConsoleStencil.VALID_STYLES:
+                prefix = f"{ ConsoleStencil.STYLE_MAP[value] }{ pad }{ prefix }"
+                
+            else:
+                valid = False
+                if not quiet:
+                    ConsoleStencil._log_error(f"Invalid { key }: '{ value }'. This style will be ignored.")
+
+        if reset:
+            suffix = f"{ suffix }{ pad }{ Style.RESET_ALL }"
+        return CompiledStyle(prefix, suffix, valid)
     
     @staticmethod
     def ansify(text: str, ansi: str) -> str:
@@ -62,10 +213,8 @@ class ConsoleStencil:
             Returns:
                 str: _description_
         """
-        ansi = ansi.lower()
-        if not ansi in ConsoleStencil.VALID_ANSI_STYLES:
-            return text
-        return f"{ ConsoleStencil.ANSI_STYLE_MAP[ansi] } { text } { ConsoleStencil.ANSI_STYLE_MAP['normal'] }"
+        compiled = ConsoleStencil.compile(reset=False, quiet=True, ansi=ansi)
+        return compiled(text) if compiled.valid else text
     
     @staticmethod
     def colorize(text: str, color: str) -> str:
@@ -83,11 +232,10 @@ class ConsoleStencil:
                 color (str): color to apply
 
         """
-        color = color.lower()
-        if not color in ConsoleStencil.VALID_COLORS:
-            return text
-        return f"{ ConsoleStencil.COLOR_MAP[color] } { text } { Style.RESET_ALL }" 
+        compiled = ConsoleStencil.compile(quiet=True, fg_color=color)
+        return compiled(text) if compiled.valid else text
     
+    @staticmethod
     def bg_colorize(text: str, color: str) -> str:
         """
         Applies color to the background of the text
@@ -101,10 +249,8 @@ class ConsoleStencil:
             text (str): text to colorize
             color (str): color to apply
         """
-        color = color.lower()
-        if not color in ConsoleStencil.VALID_COLORS:
-            return text
-        return f"{ ConsoleStencil.BACKGROUND_MAP[color] } { text } { Style.RESET_ALL }"
+        compiled = ConsoleStencil.compile(quiet=True, bg_color=color)
+        return compiled(text) if compiled.valid else text
 
     @staticmethod
     def font_variant(text: str, style: str) -> str:
@@ -120,26 +266,80 @@ class ConsoleStencil:
         Returns:
             str: The styled text.
         """
-        style = style.lower()
-        if not style in ConsoleStencil.VALID_STYLES:
-            return text
+        compiled = ConsoleStencil.compile(padded=False, quiet=True, style=style)
+        return compiled(text) if compiled.valid else text
 
-        return f"{ConsoleStencil.STYLE_MAP[style]}{text}{Style.RESET_ALL}"
+    @staticmethod
+    def _paint(line: str, codes: tuple[str, ...], band: int, offset: int, out: list[str]) -> None:
+        # Bands of whitespace are written without a code, so a code is only written when a visible band changes color
+        current = None
+        for start in range(0, len(line), band):
+            segment = line[start : start + band]
+            if not segment.isspace():
+                code = codes[(start // band + offset) % len(codes)]
+                if code != current:
+                    out.append(code)
+                    current = code
+            out.append(segment)
+        if current is not None:
+            out.append(Style.RESET_ALL)
 
     @staticmethod
-    def rainbow(text: str) -> str:
+    def _rainbow_codes(colors: tuple[str, ...]) -> tuple[str, ...]:
+        codes = tuple(ConsoleStencil.COLOR_MAP[color] for color in colors if color in ConsoleStencil.VALID_COLORS)
+        if not codes:
+            raise ValueError(f'No valid colors in { colors }')
+        return codes
+
+    @staticmethod
+    def rainbow(text: str, band: int = 1, colors: tuple[str, ...] = None) -> str:
         """
-            Apply a different color to each character in the text, cycling through available colors.
+            Apply a different color to each character in the text, cycling through RAINBOW_COLORS.
+
+            A color code is only written where the color changes and the text is reset 
+            once at the end of each line. Colors follow the column, so whitespace still
+            moves the cycle along but a band of only whitespace writes no code.
 
             Args:
                 text (str): The text to colorize.
 
+                band (int): The number of characters that share a color.
+
+                colors (tuple[str, ...], optional): The colors to cycle through in order.
+
             Returns:
                 str: The rainbow-colored text.
         """
-        colors = list(ConsoleStencil.VALID_COLORS)
-        colored_chars = [ConsoleStencil.colorize(char, colors[i % len(colors)]) for i, char in enumerate(text)]
-        return ''.join(colored_chars)
+        return ConsoleStencil.gradient(text.split('\n'), band, 0, colors)
+
+    @staticmethod
+    def gradient(lines, band: int = 1, shift: int = 1, colors: tuple[str, ...] = None) -> str:
+        """
+            Renders many lines as one rainbow block in a single call, each line starts
+            'shift' colors further along the cycle than the one above it which gives
+            a diagonal gradient, a shift of 0 gives vertical stripes.
+
+            Args:
+                lines (Iterable[str]): The lines to colorize, without newlines.
+
+                band (int): The number of characters that share a color.
+
+                shift (int): How many colors each line is offset from the previous one.
+
+                colors (tuple[str, ...], optional): The colors to cycle through in order,
+                defaults to RAINBOW_COLORS.
+
+            Returns:
+                str: The colored lines joined by newlines.
+        """
+        codes = ConsoleStencil._rainbow_codes(colors or ConsoleStencil.RAINBOW_COLORS)
+        band = max(1, band)
+        out = []
+        for row, line in enumerate(lines):
+            if row:
+                out.append('\n')
+            ConsoleStencil._paint(line, codes, band, row * shift, out)
+        return ''.join(out)
 
     @staticmethod
     def multi_style(text: str, **kwargs) -> str:
@@ -160,25 +360,57 @@ class ConsoleStencil:
             Returns:
                 str: The stylized text.
         """
-        styled_text = text
-        for key, value in kwargs.items():
-            value = value.lower()
-            if key == 'fg_color' and value in ConsoleStencil.VALID_COLORS:
-                styled_text = f"{ ConsoleStencil.COLOR_MAP[value] } { styled_text }"
-                
-            elif key == 'bg_color' and value in ConsoleStencil.VALID_COLORS:
-                styled_text = f"{ ConsoleStencil.BACKGROUND_MAP[value] } { styled_text }"
-                
-            elif key == 'ansi' and value in ConsoleStencil.VALID_ANSI_STYLES:
-                styled_text = f"{ ConsoleStencil.ANSI_STYLE_MAP[value] } { styled_text } { ConsoleStencil.ANSI_STYLE_MAP['normal'] }"
-                
-            elif key == 'style' and value in ConsoleStencil.VALID_STYLES:
-                styled_text = f"{ ConsoleStencil.STYLE_MAP[value] } { styled_text }"
-                
+        return ConsoleStencil.compile(**kwargs)(text)
+
+    @staticmethod
+    def style_lines(lines, **kwargs):
+        """
+            Lazily styles every line of an iterable with one compiled style, the style is 
+            validated once and each line costs a single concatenation so a file or 
+            generator of any size is styled in constant memory.
+
+            Line endings are kept outside the style so the reset is written before the 
+            newline rather than after it.
+
+            Args:
+                lines (Iterable[str]): The lines to style, with or without line endings.
+
+            Keyword Args:
+                Any keyword argument accepted by ConsoleStencil.compile().
+
+            Yields:
+                str: Each styled line.
+        """
+        compiled = ConsoleStencil.compile(**kwargs)
+        prefix, suffix = compiled.prefix, compiled.suffix
+        for line in lines:
+            if line.endswith('\n'):
+                body = line.rstrip('\r\n')
+                yield f'{ prefix }{ body }{ suffix }{ line[len(body):] }'
             else:
-                ConsoleStencil._log_error(f"Invalid { key }: '{ value }'. This style will be ignored.")
-                
-        return f'{ styled_text } { Style.RESET_ALL }'
+                yield f'{ prefix }{ line }{ suffix }'
+
+    @staticmethod
+    def multi_style_many(lines, out=None, **kwargs) -> list[str] | None:
+        """
+            Applies the same styles as multi_style() to many lines at once.
+
+            Args:
+                lines (Iterable[str]): The lines to style.
+
+                out (TextIO, optional): A file or buffer with a writelines() method, when 
+                given the styled lines are streamed into it instead of being collected.
+
+            Keyword Args:
+                Any keyword argument accepted by ConsoleStencil.compile().
+
+            Returns:
+                list[str]: The styled lines, or None when they were written to out.
+        """
+        styled = ConsoleStencil.style_lines(lines, **kwargs)
+        if out is None:
+            return list(styled)
+        out.writelines(styled)
 
     @staticmethod
     def highlight_phrase(text: str, phrase: str, ansi: str) -> str:
@@ -214,7 +446,7 @@ class ConsoleStencil:
             Args:
                 text (str): The text to bold.
         """
-        return ConsoleStencil.ansify(text, style='bold')
+        return ConsoleStencil.ansify(text, ansi='bold')
 
     @staticmethod
     def underline(text: str) -> str:
@@ -292,20 +524,367 @@ class ConsoleStencil:
         Returns:
             str: The text with the regex matches colored.
         """
-        if not isinstance(regex, re.Pattern) or not re.search(regex, text):
-            return text
-        
         color = color.lower()
-        
-        if color not in ConsoleStencil.VALID_COLORS:
+        if not isinstance(regex, re.Pattern) or color not in ConsoleStencil.VALID_COLORS:
             return text
-        
 
-        return regex.sub(lambda match:
-            f"{ConsoleStencil.COLOR_MAP[color]}{match.group()}{Style.RESET_ALL}",
-            text
-        )
-    
+        code = ConsoleStencil.COLOR_MAP[color]
+        return regex.sub(lambda match: f"{ code }{ match.group() }{ Style.RESET_ALL }", text)
+
+    @staticmethod
+    def _combine_patterns(pairs: list[tuple[re.Pattern, CompiledStyle]]) -> tuple[re.Pattern, dict[str, CompiledStyle]]:
+        '''
+            Joins the patterns into one alternation with a named group per pattern,
+            their flags (also those written inline at the start) become scoped 
+            inline flags. Returns (None, {}) when the patterns can't be combined 
+            without changing what they match: numbered backreferences or 
+            conditionals that would be renumbered, group names used twice.
+        '''
+        groups, styles, names = [], {}, set()
+        for idx, (regex, style) in enumerate(pairs):
+            if regex.groups and ConsoleStencil.GROUP_REFERENCE.search(regex.pattern):
+                return None, {}
+            if names & regex.groupindex.keys():
+                return None, {}
+            names.update(regex.groupindex)
+            flags = ''.join(letter for flag, letter in ConsoleStencil.SCOPED_FLAGS if regex.flags & flag)
+            body = ConsoleStencil.GLOBAL_FLAGS.sub('', regex.pattern)
+            if flags:
+                body = f'(?{ flags }:{ body })'
+            groups.append(f'(?P<_p{ idx }>{ body })')
+            styles[f'_p{ idx }'] = style
+        try:
+            return re.compile('|'.join(groups)), styles
+        except re.error:
+            return None, {}
+
+    @staticmethod
+    def _paint_separately(chunk: str, pairs: list[tuple[re.Pattern, CompiledStyle]]) -> str:
+        # Matches like the combined alternation would, the leftmost match wins and earlier
+        # patterns win ties, but every pattern is searched on its own. Each pattern's next 
+        # match is kept until the scan passes it.
+        nexts = [regex.search(chunk) for regex, _ in pairs]
+        out, pos = [], 0
+        while pos <= len(chunk):
+            best = None
+            for idx, (regex, _) in enumerate(pairs):
+                match = nexts[idx]
+                if match is not None and match.start() < pos:
+                    match = regex.search(chunk, pos)
+                    # searching past the end finds the empty match at the end again
+                    if match is not None and match.start() < pos:
+                        match = None
+                    nexts[idx] = match
+                if match is not None and (best is None or match.start() < nexts[best].start()):
+                    best = idx
+            if best is None:
+                break
+            match = nexts[best]
+            out.append(chunk[pos : match.start()])
+            out.append(pairs[best][1](match.group()))
+            pos = match.end()
+            if match.end() == match.start():
+                # an empty match can't stop the scan from moving on
+                out.append(chunk[pos : pos + 1])
+                pos += 1
+        out.append(chunk[pos:])
+        return ''.join(out)
+
+    @staticmethod
+    def _line_chunks(source, chunk_size: int):
+        readlines = getattr(source, 'readlines', None)
+        if readlines is not None:
+            for lines in iter(lambda: readlines(chunk_size), []):
+                yield ''.join(lines)
+            return
+
+        batch, size = [], 0
+        for line in source:
+            batch.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield ''.join(batch)
+                batch, size = [], 0
+        if batch:
+            yield ''.join(batch)
+
+    @staticmethod
+    def color_regex_stream(source, patterns, chunk_size: int = None):
+        """
+            Lazily colors the matches of one or more patterns in a file or stream of lines
+            without reading it into memory.
+
+            The patterns are combined into a single regex so every chunk is scanned once,
+            chunks are whole lines so a match can not span two chunks unless the pattern
+            itself matches across lines. Patterns that can't be combined (numbered 
+            backreferences, a group name used by two patterns) are searched one by one
+            instead, which gives the same result with one scan per pattern.
+
+            Args:
+                source (TextIO | Iterable[str]): A text file or any iterable of lines that 
+                keep their line endings.
+
+                patterns (Iterable[tuple[re.Pattern | str, str]] | dict): Pairs of pattern
+                and color, patterns earlier in the sequence win when two match at the 
+                same position. Pairs with an invalid color are ignored with a warning.
+
+                chunk_size (int, optional): Roughly how many characters are colored at a 
+                time, defaults to STREAM_CHUNK_SIZE.
+
+            Yields:
+                str: The colored text, chunk by chunk.
+        """
+        if isinstance(patterns, dict):
+            patterns = patterns.items()
+        pairs = []
+        for regex, color in patterns:
+            style = ConsoleStencil.compile(padded=False, fg_color=color)
+            if style.valid:
+                pairs.append((regex if isinstance(regex, re.Pattern) else re.compile(regex), style))
+
+        chunks = ConsoleStencil._line_chunks(source, chunk_size or ConsoleStencil.STREAM_CHUNK_SIZE)
+        if not pairs:
+            yield from chunks
+            return
+
+        regex, styles = ConsoleStencil._combine_patterns(pairs)
+        if regex is None:
+            for chunk in chunks:
+                yield ConsoleStencil._paint_separately(chunk, pairs)
+            return
+
+        def paint(match: re.Match) -> str:
+            return styles[match.lastgroup](match.group())
+
+        for chunk in chunks:
+            yield regex.sub(paint, chunk)
+
+
+    @staticmethod
+    def char_width(char: str) -> int:
+        """
+            Returns the number of columns a character takes up on the screen, 
+            2 for East Asian wide and fullwidth characters (CJK, most emoji), 
+            0 for combining marks, control and format characters and 1 otherwise.
+
+            A tab depends on the column it is at, sanitize() expands tabs before
+            anything is measured.
+        """
+        if char.isascii():
+            return 1 if ' ' <= char <= '~' else 0
+        if unicodedata.combining(char) or unicodedata.category(char) in ('Mn', 'Me', 'Cf', 'Cc'):
+            return 0
+        return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+    @staticmethod
+    @functools.lru_cache(maxsize=WIDTH_CACHE_SIZE)
+    def sanitize(text: str) -> str:
+        """
+            Expands the tabs of a line to spaces at every TAB_SIZE columns and drops
+            the other control characters (new lines, carriage returns, bells, stray 
+            escapes) which would move the cursor or take up no space. Escape 
+            sequences are kept and take up no columns.
+
+            Args:
+                text (str): A single line of text, styled or not.
+
+            Returns:
+                str: The text as it is laid out on the screen.
+        """
+        plain = ConsoleStencil.ESCAPE_PATTERN.sub('', text) if '\x1b' in text else text
+        if '\t' not in plain and not ConsoleStencil.CONTROL_PATTERN.search(plain):
+            return text
+
+        parts, column = [], 0
+        for idx, part in enumerate(ConsoleStencil.ESCAPE_PATTERN.split(text)):
+            if idx % 2:
+                parts.append(part)
+                continue
+            for char in part:
+                if char == '\t':
+                    spaces = ConsoleStencil.TAB_SIZE - column % ConsoleStencil.TAB_SIZE
+                    parts.append(' ' * spaces)
+                    column += spaces
+                elif not ConsoleStencil.CONTROL_PATTERN.match(char):
+                    parts.append(char)
+                    column += ConsoleStencil.char_width(char)
+        return ''.join(parts)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=WIDTH_CACHE_SIZE)
+    def visible_width(text: str) -> int:
+        """
+            Returns the number of columns the text takes up on the screen, escape
+            sequences are skipped, tabs reach the next tab stop and wide characters 
+            count as two columns.
+
+            Args:
+                text (str): A single line of text, styled or not.
+
+            Returns:
+                int: The display width of the text.
+        """
+        if text.isascii() and text.isprintable():
+            return len(text)
+        text = ConsoleStencil.ESCAPE_PATTERN.sub('', ConsoleStencil.sanitize(text))
+        if text.isascii():
+            return len(text)
+        return sum(map(ConsoleStencil.char_width, text))
+
+    @staticmethod
+    def slice_columns(text: str, start: int, width: int) -> str:
+        """
+            Returns the part of the unstyled text shown in the columns start to start + width,
+            a wide character cut in half by either edge is replaced by a space. Tabs are
+            expanded from the start of the text.
+
+            Args:
+                text (str): A single line of text without escape sequences.
+
+                start (int): The first column shown.
+
+                width (int): The number of columns shown.
+        """
+        if not (text.isascii() and text.isprintable()):
+            text = ConsoleStencil.sanitize(text)
+        if text.isascii():
+            return text[start : start + width]
+
+        chars, column, end = [], 0, start + width
+        for char in text:
+            if column >= end:
+                break
+            char_width = ConsoleStencil.char_width(char)
+            if column >= start:
+                chars.append(char if column + char_width <= end else ' ')
+            elif column + char_width > start:
+                chars.append(' ')
+            column += char_width
+        return ''.join(chars)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=WIDTH_CACHE_SIZE)
+    def truncate(text: str, width: int, ellipsis: str = '…') -> str:
+        """
+            Cuts the text down to the number of columns passed, ending it with the
+            ellipsis when anything was cut. Escape sequences are kept and a reset 
+            is added after the ellipsis if the text was styled, the text is 
+            sanitized so tabs are expanded to spaces.
+
+            Args:
+                text (str): A single line of text, styled or not.
+
+                width (int): The maximum display width.
+
+                ellipsis (str): Marks where the text was cut.
+
+            Returns:
+                str: The text, at most width columns wide.
+        """
+        text = ConsoleStencil.sanitize(text)
+        if ConsoleStencil.visible_width(text) <= width:
+            return text
+        room = width - ConsoleStencil.visible_width(ellipsis)
+        if room < 0:
+            return ConsoleStencil.slice_columns(ellipsis, 0, width)
+
+        parts, column, styled = [], 0, False
+        for idx, part in enumerate(ConsoleStencil.ESCAPE_PATTERN.split(text)):
+            if idx % 2:
+                parts.append(part)
+                styled = True
+                continue
+            for char in part:
+                char_width = ConsoleStencil.char_width(char)
+                if column + char_width > room:
+                    break
+                parts.append(char)
+                column += char_width
+            else:
+                continue
+            break
+        parts.append(ellipsis)
+        if styled:
+            parts.append(Style.RESET_ALL)
+        return ''.join(parts)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=WIDTH_CACHE_SIZE)
+    def pad(text: str, width: int, align: str = 'left') -> str:
+        """
+            Pads the text with spaces to the number of columns passed, text that
+            is already as wide or wider is returned as is (sanitized, like truncate).
+
+            Args:
+                text (str): A single line of text, styled or not.
+
+                width (int): The display width to pad to.
+
+                align (str): 'left', 'right' or 'center'.
+
+            Returns:
+                str: The padded text.
+        """
+        text = ConsoleStencil.sanitize(text)
+        missing = width - ConsoleStencil.visible_width(text)
+        if missing <= 0:
+            return text
+        if align == 'right':
+            return f'{ " " * missing }{ text }'
+        if align == 'center':
+            left = missing // 2
+            return f'{ " " * left }{ text }{ " " * (missing - left) }'
+        return f'{ text }{ " " * missing }'
+
+
+class KeywordHighlighter:
+    '''
+        Highlights any number of phrases in a single pass over the text, the phrases 
+        are compiled once into one alternation regex with the longest phrases first
+        so the longest phrase starting at a position wins, and the styles of every
+        match are looked up in a dictionary.
+
+        Because the text is only scanned once no phrase can match inside the escape
+        codes written for another.
+
+        mapping: dict[str, CompiledStyle | dict]: Each phrase and the style to apply
+        to it, either a CompiledStyle or the keyword arguments for ConsoleStencil.compile().
+
+        ignore_case: bool: If True phrases match regardless of case and the matched 
+        text keeps its original case.
+    '''
+
+    def __init__(self, mapping: dict, ignore_case: bool = False) -> None:
+        self.ignore_case: bool = ignore_case
+        self.styles: dict[str, CompiledStyle] = {}
+        for phrase, style in mapping.items():
+            if not phrase:
+                continue
+            if not isinstance(style, CompiledStyle):
+                style = ConsoleStencil.compile(padded=False, **style)
+            self.styles[phrase] = style
+        # every phrase is its own group so a match finds its style by group number, looking
+        # it up by the matched text breaks when a case-insensitive match doesn't casefold back
+        phrases = sorted(self.styles, key=len, reverse=True)
+        self.group_styles: list[CompiledStyle] = [self.styles[phrase] for phrase in phrases]
+        flags = re.IGNORECASE if ignore_case else 0
+        alternation = '|'.join(f'({ re.escape(phrase) })' for phrase in phrases)
+        self.pattern: re.Pattern = re.compile(alternation, flags) if phrases else None
+
+    def __style(self, match: re.Match) -> str:
+        return self.group_styles[match.lastindex - 1](match.group())
+
+    def __call__(self, text: str) -> str:
+        '''
+            Returns the text with every phrase highlighted.
+        '''
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self.__style, text)
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
 
 def regex_test() -> None:
     text = "There are 3 apples and 7 oranges in the basket. The price of 2 apples is $5."
@@ -0,0 +1,565 @@
+import bisect
+import codecs
+import hashlib
+import itertools
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from collections.abc import Sequence
+
+
+class LineIndexCache:
+    '''
+        Saves the line index of large files so reopening them skips the scan.
+
+        An index is stored per file path in the cache directory together with the 
+        size, mtime and inode the file had when it was indexed. It is reused as is
+        when they still match, and when the file has only grown (same inode, the 
+        bytes at the old end unchanged) the saved index is extended from where 
+        it stopped. Anything else (a rewritten or replaced file) is re-indexed.
+
+        Failing to read or write the cache is never an error, the file is 
+        just indexed again.
+
+        The indexes are kept in $XDG_CACHE_HOME/console_menus/line_index (or
+        ~/.cache/console_menus/line_index), one <sha1 of the path>.idx file per
+        indexed file. Loading an index marks it as used, and saving one deletes
+        the least recently used indexes until they take at most max_size bytes.
+        MappedLineStore(use_cache=False) opts out of the cache, and the whole 
+        directory can be deleted at any time.
+
+        MIN_SIZE: int: Files smaller than this are fast to index and not cached.
+
+        MAX_SIZE: int: The default total size of the saved indexes in bytes.
+    '''
+    MIN_SIZE: int = 16 * 1024 * 1024
+    MAX_SIZE: int = 512 * 1024 * 1024
+
+    # magic, byte order, file size, mtime (ns), inode, device, crc of the tail
+    HEADER: struct.Struct = struct.Struct('<8s1sQQQQI')
+    MAGIC: bytes = b'LINEIDX1'
+    TAIL_SIZE: int = 4096
+
+    def __init__(self, directory: str = None, max_size: int = MAX_SIZE) -> None:
+        if directory is None:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            directory = os.path.join(base, 'console_menus', 'line_index')
+        self.directory: str = directory
+        self.max_size: int = max_size
+
+    def path_for(self, path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self.directory, f'{ key }.idx')
+
+    @staticmethod
+    def tail_crc(data, size: int) -> int:
+        return zlib.crc32(data[max(0, size - LineIndexCache.TAIL_SIZE) : size])
+
+    def load(self, path: str, stat: os.stat_result, data) -> tuple[array, int]:
+        '''
+            Returns the saved (offsets, indexed size) for the file or None 
+            when there is no usable index.
+        '''
+        try:
+            with open(self.path_for(path), 'rb') as cache_file:
+                header = cache_file.read(LineIndexCache.HEADER.size)
+                magic, byteorder, size, mtime, inode, device, crc = LineIndexCache.HEADER.unpack(header)
+                if magic != LineIndexCache.MAGIC or byteorder != sys.byteorder[0].encode():
+                    return None
+                if (inode, device) != (stat.st_ino, stat.st_dev) or size > stat.st_size:
+                    return None
+                if size == stat.st_size and mtime != stat.st_mtime_ns:
+                    return None
+                if size < stat.st_size and LineIndexCache.tail_crc(data, size) != crc:
+                    return None
+                offsets = array('Q')
+                offsets.frombytes(cache_file.read())
+        except (OSError, ValueError, struct.error):
+            return None
+        try:
+            # the mtime of an index is when it was last used
+            os.utime(self.path_for(path))
+        except OSError:
+            pass
+        return offsets, size
+
+    def save(self, path: str, stat: os.stat_result, data, offsets: array, size: int) -> None:
+        '''
+            Saves the index of the first size bytes of the file, 
+            replacing any saved index atomically.
+        '''
+        if size < LineIndexCache.MIN_SIZE:
+            return
+        header = LineIndexCache.HEADER.pack(
+            LineIndexCache.MAGIC, sys.byteorder[0].encode(), size, stat.st_mtime_ns,
+            stat.st_ino, stat.st_dev, LineIndexCache.tail_crc(data, size)
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as cache_file:
+                    cache_file.write(header)
+                    offsets.tofile(cache_file)
+                os.replace(tmp_path, self.path_for(path))
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+            self.__evict(keep=self.path_for(path))
+        except OSError:
+            pass
+
+    def __evict(self, keep: str) -> None:
+        '''
+            Deletes the least recently used indexes, other than the one just 
+            saved, until the indexes take at most max_size bytes.
+        '''
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith('.idx') and entry.path != keep:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class MappedLineStore(Sequence):
+    '''
+        The lines of a file read through a memory map, for viewing files far
+        larger than memory.
+
+        Opening only maps the file, the offset of every line start is found in
+        CHUNK_SIZE chunks by a background thread and kept in a compact array('Q')
+        (8 bytes per line). Lines are decoded when they are read so only the
+        visible lines are ever turned into strings.
+
+        len() is the number of lines indexed so far and grows while indexing.
+        Lines are split on '\\n' like str.split('\\n'), so a trailing newline
+        ends with an empty line.
+
+        The finished index of a large file is saved to INDEX_CACHE, reopening the
+        file loads it instead of scanning again (use_cache=False disables this).
+
+        refresh() picks up changes to a file that is being written to: appended
+        bytes are mapped and indexed, a truncated or rotated (replaced) file is
+        opened again from the start.
+
+        CHUNK_SIZE: int: The number of bytes scanned for newlines at a time.
+    '''
+    CHUNK_SIZE: int = 4 * 1024 * 1024
+
+    INDEX_CACHE: LineIndexCache = LineIndexCache()
+
+    UNCHANGED, GROWN, TRUNCATED, ROTATED = 'unchanged', 'grown', 'truncated', 'rotated'
+
+    def __init__(self, path: str, encoding: str = 'utf-8', errors: str = 'replace', use_cache: bool = True) -> None:
+        self.path: str = path
+        self.encoding: str = encoding
+        self.errors: str = errors
+        self.use_cache: bool = use_cache
+        self.file = None
+        self.thread: threading.Thread = None
+        self.__open()
+
+    def __open(self) -> None:
+        self.offsets: array = array('Q', [0])
+        self.indexed: int = 0
+        self.stopped: bool = False
+        self.file = open(self.path, 'rb')
+        self.stat: os.stat_result = os.fstat(self.file.fileno())
+        self.size: int = self.stat.st_size
+        self.data = self.__map(self.size)
+        self.thread = threading.Thread(target=self.__index, daemon=True)
+        self.thread.start()
+
+    def __map(self, size: int):
+        # an empty file can't be mapped
+        return mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ) if size else b''
+
+    def __index(self) -> None:
+        if self.use_cache:
+            self.__load_index()
+        cached = self.indexed
+        while self.indexed < self.size and not self.stopped:
+            self.index_chunk()
+        if self.use_cache and self.indexed == self.size and cached < self.size:
+            MappedLineStore.INDEX_CACHE.save(self.path, self.stat, self.data, self.offsets, self.size)
+
+    def __load_index(self) -> None:
+        saved = MappedLineStore.INDEX_CACHE.load(self.path, self.stat, self.data)
+        if saved:
+            # indexed is published last so len() never counts a line the offsets don't have
+            self.offsets, indexed = saved
+            self.indexed = indexed
+
+    def index_chunk(self) -> None:
+        '''
+            Finds the line starts in the next chunk. The lengths of the pieces
+            between newlines are summed with accumulate() so the scan runs in C
+            instead of a Python loop per line.
+        '''
+        start = self.indexed
+        end = min(start + MappedLineStore.CHUNK_SIZE, self.size)
+        pieces = self.data[start:end].split(b'\n')
+        starts = itertools.accumulate(map((1).__add__, map(len, pieces[:-1])), initial=start)
+        self.offsets.extend(itertools.islice(starts, 1, None))
+        self.indexed = end
+
+    @property
+    def indexing(self) -> bool:
+        return self.indexed < self.size and not self.stopped
+
+    @property
+    def progress(self) -> float:
+        '''
+            The fraction of the file indexed so far.
+        '''
+        return self.indexed / self.size if self.size else 1.0
+
+    def wait(self) -> None:
+        '''
+            Blocks until the whole file is indexed.
+        '''
+        self.thread.join()
+
+    def __len__(self) -> int:
+        # the last line start found may begin a line whose end isn't indexed yet
+        return len(self.offsets) - 1 if self.indexing else len(self.offsets)
+
+    def line_span(self, idx: int) -> tuple[int, int]:
+        '''
+            Returns the (start, end) byte offsets of the line, without its newline.
+        '''
+        start = self.offsets[idx]
+        end = self.offsets[idx + 1] - 1 if idx + 1 < len(self.offsets) else self.size
+        return start, end
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[pos] for pos in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('MappedLineStore index out of range')
+        start, end = self.line_span(idx)
+        return self.data[start:end].decode(self.encoding, self.errors)
+
+    def text_chunk(self, start: int, end: int) -> str:
+        '''
+            Returns lines start to end (exclusive) as one newline separated 
+            string, decoded with a single call.
+        '''
+        first, _ = self.line_span(start)
+        _, last = self.line_span(end - 1)
+        return self.data[first:last].decode(self.encoding, self.errors)
+
+    def refresh(self) -> str:
+        '''
+            Checks the file for changes with a single stat() call and returns 
+            what happened: UNCHANGED, GROWN, TRUNCATED or ROTATED.
+
+            Only the appended bytes are indexed when the file grew, the lines
+            already indexed keep their offsets.
+        '''
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # rotated away and not recreated yet
+            return MappedLineStore.UNCHANGED
+
+        if (stat.st_ino, stat.st_dev) != (self.stat.st_ino, self.stat.st_dev):
+            self.close()
+            self.__open()
+            return MappedLineStore.ROTATED
+
+        if stat.st_size < self.size:
+            self.close()
+            self.__open()
+            return MappedLineStore.TRUNCATED
+
+        status = MappedLineStore.UNCHANGED
+        if stat.st_size > self.size:
+            # the old map isn't closed, the indexing thread may still be reading
+            # it and it is unmapped once the last reference to it is dropped
+            self.data = self.__map(stat.st_size)
+            self.stat = stat
+            self.size = stat.st_size
+            status = MappedLineStore.GROWN
+
+        # the indexing thread may have stopped just before the file grew
+        if not self.thread.is_alive():
+            while self.indexed < self.size:
+                self.index_chunk()
+        return status
+
+    def close(self) -> None:
+        self.stopped = True
+        self.thread.join()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> 'MappedLineStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.close()
+        return False
+
+
+class LineSearch:
+    '''
+        Searches lines for a regex in a background thread, the numbers of the
+        matching lines are appended to matches in increasing order as they are
+        found so results can be used while the search is still running.
+
+        Lines are searched CHUNK_LINES at a time as one newline separated string,
+        so the regex engine runs over a whole chunk in C. The pattern is compiled 
+        with re.MULTILINE so '^' and '$' match at line boundaries. When the lines
+        are still being indexed the search follows the index until it is done.
+
+        An invalid pattern raises re.error when the search is created.
+        LineSearch.create() picks a ParallelLineSearch for large files.
+
+        CHUNK_LINES: int: The number of lines searched at a time.
+    '''
+    CHUNK_LINES: int = 65536
+
+    # how long to wait for more lines while the file is still being indexed
+    INDEX_WAIT: float = 0.05
+
+    def __init__(self, lines: Sequence[str], pattern: str, flags: int = 0) -> None:
+        self.lines: Sequence[str] = lines
+        self.pattern: re.Pattern = re.compile(pattern, flags | re.MULTILINE)
+        self.matches: list[int] = []
+        self.scanned: int = 0
+        self.cancelled: bool = False
+        self.done: bool = False
+        self.thread: threading.Thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def create(lines: Sequence[str], pattern: str, flags: int = 0) -> 'LineSearch':
+        '''
+            Returns the search best suited for the lines, files of at least
+            ParallelLineSearch.MIN_SIZE bytes are searched on every core.
+        '''
+        if ParallelLineSearch.supports(lines):
+            return ParallelLineSearch(lines, pattern, flags)
+        return LineSearch(lines, pattern, flags)
+
+    @property
+    def running(self) -> bool:
+        return not self.done
+
+    @property
+    def progress(self) -> float:
+        '''
+            The fraction of the lines searched so far.
+        '''
+        return min(1.0, self.scanned / len(self.lines)) if len(self.lines) else 1.0
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def wait(self) -> None:
+        self.thread.join()
+
+    def __chunk(self, start: int, end: int) -> str:
+        if hasattr(self.lines, 'text_chunk'):
+            return self.lines.text_chunk(start, end)
+        return '\n'.join(self.lines[start:end])
+
+    def __run(self) -> None:
+        try:
+            self.scan()
+        finally:
+            self.done = True
+
+    def scan(self) -> None:
+        '''
+            Runs in the search thread until every line was searched 
+            or the search is cancelled.
+        '''
+        while not self.cancelled:
+            available = len(self.lines)
+            if self.scanned < available:
+                end = min(available, self.scanned + LineSearch.CHUNK_LINES)
+                self.__scan_chunk(self.scanned, end)
+                self.scanned = end
+            elif getattr(self.lines, 'indexing', False):
+                time.sleep(LineSearch.INDEX_WAIT)
+            else:
+                break
+
+    def __scan_chunk(self, start: int, end: int) -> None:
+        '''
+            Maps every match in the chunk to its line by counting the newlines
+            since the previous match, later matches on a line already found
+            are skipped.
+        '''
+        text = self.__chunk(start, end)
+        line, position = start, 0
+        found = []
+        for match in self.pattern.finditer(text):
+            line += text.count('\n', position, match.start())
+            position = match.start()
+            if not found or found[-1] != line:
+                found.append(line)
+        self.matches.extend(found)
+
+    def next_match(self, line: int) -> int:
+        '''
+            Returns the first match after line, wrapping around once the search
+            is done, or None when there is none (yet).
+        '''
+        idx = bisect.bisect_right(self.matches, line)
+        if idx < len(self.matches):
+            return self.matches[idx]
+        if self.done and self.matches:
+            return self.matches[0]
+        return None
+
+    def previous_match(self, line: int) -> int:
+        '''
+            Returns the last match before line, wrapping around once the 
+            search is done, or None when there is none (yet).
+        '''
+        idx = bisect.bisect_left(self.matches, line)
+        if idx > 0:
+            return self.matches[idx - 1]
+        if self.done and self.matches:
+            return self.matches[-1]
+        return None
+
+
+def search_range(path: str, start: int, end: int, encoding: str, errors: str, pattern: str, flags: int) -> list[int]:
+    '''
+        Returns the numbers of the matching lines between the byte offsets start 
+        and end of the file, counted from the line at start. Runs in a worker 
+        process of ParallelLineSearch.
+
+        The range is decoded and searched with the str pattern like LineSearch 
+        does, after a match the search continues on the next line.
+    '''
+    regex = re.compile(pattern, flags)
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # the newline ending the range separates it from the next one, it doesn't start a line
+        stop = end - 1 if end < len(data) else end
+        text = data[start:stop].decode(encoding, errors)
+    hits = []
+    line, position = 0, 0
+    while position <= len(text):
+        match = regex.search(text, position)
+        if not match:
+            break
+        line += text.count('\n', position, match.start())
+        hits.append(line)
+        position = text.find('\n', match.start()) + 1
+        if position == 0:
+            break
+        line += 1
+    return hits
+
+
+class ParallelLineSearch(LineSearch):
+    '''
+        Searches a MappedLineStore on every CPU core, the file is split into 
+        newline-aligned byte ranges of about RANGE_SIZE bytes that are decoded
+        and searched by a ProcessPoolExecutor, so the same lines are found as
+        by LineSearch. The workers are started with the 'spawn' method, forking
+        would copy the process while the indexing thread is running.
+
+        The line numbers found in each range are offset by the number of the 
+        range's first line, found with a bisect on the store's offset index, 
+        and published in file order so matches stays sorted while ranges finish 
+        out of order. Cancelling drops the ranges that haven't started.
+
+        Only used for encodings where every b'\\n' byte is a newline, 
+        so ranges can be split without decoding the file.
+
+        MIN_SIZE: int: Smaller files are searched by a single thread.
+
+        RANGE_SIZE: int: The approximate number of bytes scanned per task.
+    '''
+    MIN_SIZE: int = 64 * 1024 * 1024
+    RANGE_SIZE: int = 16 * 1024 * 1024
+
+    # how often the coordinating thread checks for cancellation
+    POLL_INTERVAL: float = 0.1
+
+    BYTE_ENCODINGS: frozenset[str] = frozenset({'utf-8', 'ascii', 'latin-1', 'iso8859-1'})
+
+    @staticmethod
+    def supports(lines: Sequence[str]) -> bool:
+        if not isinstance(lines, MappedLineStore) or lines.size < ParallelLineSearch.MIN_SIZE:
+            return False
+        return codecs.lookup(lines.encoding).name in ParallelLineSearch.BYTE_ENCODINGS
+
+    def __init__(self, lines: MappedLineStore, pattern: str, flags: int = 0, workers: int = None) -> None:
+        self.workers: int = workers or os.cpu_count() or 1
+        self.scanned_bytes: int = 0
+        super().__init__(lines, pattern, flags)
+
+    @property
+    def progress(self) -> float:
+        return min(1.0, self.scanned_bytes / self.lines.size) if self.lines.size else 1.0
+
+    def ranges(self) -> list[tuple[int, int]]:
+        '''
+            Splits the file into byte ranges that start at the beginning 
+            of a line and end after a newline (or at the end of the file).
+        '''
+        data, size = self.lines.data, self.lines.size
+        ranges, start = [], 0
+        while start < size:
+            end = data.find(b'\n', min(start + ParallelLineSearch.RANGE_SIZE, size) - 1) + 1
+            end = end if end else size
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def scan(self) -> None:
+        lines = self.lines
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            ranges = self.ranges()
+            futures = [
+                executor.submit(search_range, lines.path, start, end, lines.encoding, 
+                lines.errors, self.pattern.pattern, self.pattern.flags)
+                for start, end in ranges
+            ]
+            for future, (start, end) in zip(futures, ranges):
+                while not self.cancelled and not future.done():
+                    wait([future], timeout=ParallelLineSearch.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if self.cancelled:
+                    return
+                hits = future.result()
+                # the hits can only be numbered once the index reaches them
+                while lines.indexed < end and lines.indexing and not self.cancelled:
+                    time.sleep(LineSearch.INDEX_WAIT)
+                first = bisect.bisect_left(lines.offsets, start)
+                self.matches.extend(first + hit for hit in hits)
+                self.scanned_bytes = end
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,384 @@
+import bisect
+import functools
+import heapq
+import itertools
+import math
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from colorify import CompiledStyle
+
+
+class FilterView(Sequence):
+    '''
+        The options matching a query, a window into the sorted order of an
+        index. Creating a view copies nothing so it costs the same for ten
+        matches or a million.
+    '''
+
+    def __init__(self, options: Sequence, order: Sequence[int], start: int, end: int) -> None:
+        self.options: Sequence = options
+        self.order: Sequence[int] = order
+        self.start: int = start
+        self.end: int = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.options[self.order[self.start + pos]] for pos in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('FilterView index out of range')
+        return self.options[self.order[self.start + idx]]
+
+
+class PrefixIndex:
+    '''
+        A prefix index over menu options for type-ahead filtering.
+
+        The option keys are lower-cased and sorted once when the index is built,
+        a query is then answered with two bisects. When a query extends the
+        previous one the search only bisects inside the previous result range,
+        so each keystroke costs O(log n) even for millions of options.
+
+        Matches are returned in alphabetical order.
+    '''
+    # sorts after every character so (query + HIGHEST) bounds all keys starting with query
+    HIGHEST: str = '\U0010ffff'
+
+    def __init__(self, options: Sequence, key: Callable[[object], str] = str) -> None:
+        self.options: Sequence = options
+        keys = [key(option).lower() for option in options]
+        self.order: list[int] = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys: list[str] = [keys[idx] for idx in self.order]
+        self.query: str = ''
+        self.bounds: tuple[int, int] = (0, len(self.keys))
+
+    def search(self, query: str) -> FilterView:
+        '''
+            Returns the view of the options starting with the query passed,
+            ignoring case.
+        '''
+        query = query.lower()
+        if query.startswith(self.query):
+            start, end = self.bounds
+        else:
+            start, end = 0, len(self.keys)
+
+        start = bisect.bisect_left(self.keys, query, start, end)
+        end = bisect.bisect_left(self.keys, query + PrefixIndex.HIGHEST, start, end)
+        self.query = query
+        self.bounds = (start, end)
+        return FilterView(self.options, self.order, start, end)
+
+
+class FuzzyView(Sequence):
+    '''
+        The best ranked options for a fuzzy query, ordered by score.
+
+        positions: list[tuple[int, ...]]: The matched character positions
+        of each option, used to highlight them.
+
+        total: int: The number of options that matched, only the best
+        ranked ones are kept in the view.
+    '''
+
+    def __init__(self, options: list, positions: list[tuple[int, ...]], total: int) -> None:
+        self.options: list = options
+        self.positions: list[tuple[int, ...]] = positions
+        self.total: int = total
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def __getitem__(self, idx):
+        return self.options[idx]
+
+
+class FuzzyMatcher:
+    '''
+        fzf-style fuzzy matching over menu options, an option matches when the
+        characters of the query appear in it in order (case-insensitive).
+
+        The lower-cased keys are joined into a single text blob when the matcher 
+        is built so that finding the candidates is one regex scan in C instead of 
+        a Python loop per option. Candidates are scored (consecutive characters, 
+        word boundaries and gaps) from the end of their regex match, so the forward
+        scan is not repeated, and the top results are kept in a heap. A candidate
+        whose upper bound can't beat the worst result kept is skipped unscored.
+        Single character queries are ranked by regex scans alone.
+
+        The regex scan stays linear in the size of the options: with 500k options
+        a single character takes about 0.1 s, longer queries 0.2 to 0.6 s when
+        most candidates are pruned and up to about 1 s when many match almost 
+        equally well (timed on a slow machine).
+
+        Results are cached per query so backspace is instant, and a query that
+        extends a cached one only re-checks the previous candidates when they 
+        are a small part of the options.
+
+        LIMIT: int: The default number of results kept.
+    '''
+    LIMIT: int = 100
+
+    CACHE_SIZE: int = 64
+
+    # re-checking the previous candidates is only faster than a scan below this ratio
+    REFINE_RATIO: float = 0.5
+
+    SCORE_MATCH: int = 16
+    BONUS_CONSECUTIVE: int = 8
+    BONUS_BOUNDARY: int = 8
+    BONUS_FIRST_CHAR: int = 8
+    PENALTY_GAP_START: int = 3
+    PENALTY_GAP_EXTENSION: int = 1
+
+    WORD_SEPARATORS: frozenset[str] = frozenset(' _-/\\.:,;|()[]{}')
+
+    BOUNDARIES: frozenset[str] = WORD_SEPARATORS | {'\n'}
+
+    def __init__(self, options: Sequence, key: Callable[[object], str] = str, limit: int = LIMIT) -> None:
+        self.options: Sequence = options
+        self.key: Callable[[object], str] = key
+        self.limit: int = limit
+        self.keys: list[str] = [key(option).lower().replace('\n', ' ') for option in options]
+        # every option is preceded by a new line so it also marks the start of the first one
+        self.blob: str = ''.join(f'\n{ text }' for text in self.keys)
+        self.line_starts: list[int] = list(itertools.accumulate(
+            (len(text) + 1 for text in self.keys[:-1]), initial=1
+        ))
+        self.cache: OrderedDict[str, tuple[FuzzyView, list[int]]] = OrderedDict()
+
+    @staticmethod
+    def compile_query(query: str) -> re.Pattern:
+        # each character is the first occurrence after the previous one without crossing into
+        # the next option, a negated class never backtracks and starting with a literal lets
+        # the regex engine skip ahead to the first character. The rest of the option is 
+        # consumed so every option matches at most once.
+        gaps = ''.join(f'[^\n{ re.escape(char) }]*{ re.escape(char) }' for char in query[1:])
+        return re.compile(f'({ re.escape(query[0]) }{ gaps })[^\n]*')
+
+    def search(self, query: str) -> FuzzyView:
+        '''
+            Returns the best ranked options matching the query passed.
+        '''
+        query = query.lower()
+        if not query:
+            shown = [self.options[idx] for idx in range(min(self.limit, len(self.options)))]
+            return FuzzyView(shown, [()] * len(shown), len(self.options))
+
+        cached = self.cache.get(query)
+        if cached:
+            self.cache.move_to_end(query)
+            return cached[0]
+
+        pattern = FuzzyMatcher.compile_query(query)
+        if len(query) == 1:
+            ranked, total, starts = self.__rank_char(query, pattern)
+        else:
+            ranked, starts = self.__rank(query, pattern)
+            total = len(starts)
+
+        options, shown = [], []
+        for _, neg_start, positions in ranked:
+            idx = bisect.bisect_right(self.line_starts, -neg_start) - 1
+            options.append(self.options[idx])
+            shown.append(tuple(pos - self.line_starts[idx] for pos in positions))
+        view = FuzzyView(options, shown, total)
+        self.cache[query] = (view, starts)
+        if len(self.cache) > FuzzyMatcher.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return view
+
+    def __rank_char(self, char: str, pattern: re.Pattern) -> tuple[list, int, list[int]]:
+        '''
+            Ranks a single character query. Its score only depends on what comes
+            before the first occurrence in an option (the start of the option, a 
+            word separator or anything else), so the best results are the first 
+            options of each of these three kinds, found by a regex scan per kind 
+            that stops as soon as enough were found.
+
+            The matches are only counted (by findall() in C), their starts are 
+            kept when there are few enough to re-check for a longer query.
+        '''
+        blob, limit = self.blob, self.limit
+        literal = re.escape(char)
+        separators = ''.join(map(re.escape, sorted(FuzzyMatcher.WORD_SEPARATORS - {char})))
+        plain = FuzzyMatcher.SCORE_MATCH
+        boundary = plain + FuzzyMatcher.BONUS_BOUNDARY
+        kinds = (
+            (boundary + FuzzyMatcher.BONUS_FIRST_CHAR, f'\n({ literal })'),
+            (boundary, f'\n[^\n{ literal }]*[{ separators }]({ literal })'),
+            (plain, f'\n[^\n{ literal }]*[^\n{ literal }{ separators }]({ literal })'),
+        )
+        ranked = []
+        for value, kind in kinds:
+            for match in itertools.islice(re.finditer(kind, blob), limit - len(ranked)):
+                start = match.start(1)
+                ranked.append((value, -start, (start,)))
+
+        total = len(pattern.findall(blob))
+        starts = None
+        if total < len(self.keys) * FuzzyMatcher.REFINE_RATIO:
+            starts = [match.start() for match in pattern.finditer(blob)]
+        return ranked, total, starts
+
+    def __rank(self, query: str, pattern: re.Pattern) -> tuple[list, list[int]]:
+        '''
+            Ranks a query of several characters, returning the best results and
+            the start of every match.
+
+            Matches are scored in place in the blob and kept in a heap of the 
+            best results so far, an option's index is only looked up if it makes
+            the top results (blob order is option order). Once the heap is full
+            a match is only scored when an upper bound of its score, from a few 
+            string calls in C, could still beat the worst result kept:
+
+            * the query is found as a whole just before the end of the match: the
+              window scored is contiguous and its score is computed directly.
+            * otherwise there is at least one gap, at least as wide as the distance 
+              between the end of the match and the last place the first character
+              fits. Every character that could be at a boundary is assumed to be,
+              except the last one whose place is known.
+
+            Pruning saves the most when many options match well, in the worst case
+            every match is still scored.
+        '''
+        blob, score, limit, length = self.blob, FuzzyMatcher.score, self.limit, len(query)
+        first, penultimate, boundaries = query[0], query[-2], FuzzyMatcher.BOUNDARIES
+        first_bonus, boundary_bonus = FuzzyMatcher.BONUS_FIRST_CHAR, FuzzyMatcher.BONUS_BOUNDARY
+        extension = FuzzyMatcher.PENALTY_GAP_EXTENSION
+
+        # characters following a separator in the query get a boundary bonus when consecutive
+        separators = sum(char in boundaries for char in query[:-1])
+        contiguous = (
+            FuzzyMatcher.SCORE_MATCH * length + FuzzyMatcher.BONUS_CONSECUTIVE * (length - 1) 
+            + boundary_bonus * separators
+        )
+        # with gaps > 0 the score is at most this minus the extension penalty of every gap 
+        # character, when the gap start penalty is at least the extension penalty
+        gapped = max(
+            FuzzyMatcher.SCORE_MATCH * length + boundary_bonus * (1 + gaps + separators)
+            + FuzzyMatcher.BONUS_CONSECUTIVE * (length - 1 - gaps)
+            for gaps in (1, length - 1)
+        ) - FuzzyMatcher.PENALTY_GAP_START + extension
+
+        starts, heap = [], []
+        append, startswith, rfind = starts.append, blob.startswith, blob.rfind
+        # ties are broken by the earlier option, so once the heap is full a later 
+        # match only gets in with a higher score than the worst result kept
+        worst = -math.inf
+        for match in self.__candidates(query, pattern):
+            start, end = match.span(1)
+            append(start)
+            if startswith(query, end - length):
+                before = blob[end - length - 1]
+                value = contiguous
+                if before in boundaries:
+                    value += boundary_bonus + (first_bonus if before == '\n' else 0)
+                if value <= worst:
+                    continue
+                positions = list(range(end - length, end))
+            else:
+                # the last character is at the end of the match, after a gap it only
+                # gets the boundary bonus counted for it when it is at a boundary
+                before = blob[end - 2]
+                bound = gapped
+                if before != penultimate and before not in boundaries:
+                    bound -= boundary_bonus
+                # the first character is at most at the last place it fits before the 
+                # end, which bounds the total gap
+                gap = max(1, end - rfind(first, start, end - length + 1) - length)
+                if blob[start - 1] == '\n':
+                    # the first character bonus is only possible when the window starts there
+                    bound += max(-extension * gap, first_bonus - extension * max(1, end - start - length))
+                else:
+                    bound -= extension * gap
+                if bound <= worst:
+                    continue
+                value, positions = score(blob, query, end - 1, start)
+                if value <= worst:
+                    continue
+            if len(heap) < limit:
+                heapq.heappush(heap, (value, -start, positions))
+                if len(heap) < limit:
+                    continue
+            else:
+                heapq.heapreplace(heap, (value, -start, positions))
+            worst = heap[0][0]
+        return sorted(heap, reverse=True), starts
+
+    def __candidates(self, query: str, pattern: re.Pattern):
+        '''
+            Returns the match of every option matching the query, re-checking 
+            only the candidates of a cached shorter query when there are few 
+            of them and scanning the whole blob otherwise. 
+
+            The first match in an option starts at the leftmost character that 
+            can begin it, so a longer query can only match from the same start.
+        '''
+        previous = self.cache.get(query[:-1])
+        if previous and previous[1] is not None and len(previous[1]) < len(self.keys) * FuzzyMatcher.REFINE_RATIO:
+            return filter(None, map(functools.partial(pattern.match, self.blob), previous[1]))
+        return pattern.finditer(self.blob)
+
+    @staticmethod
+    def score(text: str, query: str, end: int = None, start: int = 0) -> tuple[int, list[int]]:
+        '''
+            Scores a lower-cased text that contains the query as a subsequence,
+            returning the score and the matched positions.
+
+            The end of the first match found scanning forward is kept and the 
+            query is then matched backwards from it, which gives the tightest 
+            window ending there (like fzf's v1 algorithm). When the end is
+            already known (from the candidate regex) the forward scan is skipped.
+
+            The text can also be the blob of every option with start the beginning 
+            of the match, a new line counts as the start of an option.
+        '''
+        pos = end
+        if pos is None:
+            pos = start - 1
+            for char in query:
+                pos = text.find(char, pos + 1)
+        positions = []
+        for char in reversed(query):
+            pos = text.rfind(char, start, pos + 1)
+            positions.append(pos)
+            pos -= 1
+        positions.reverse()
+
+        score, previous = 0, None
+        for pos in positions:
+            score += FuzzyMatcher.SCORE_MATCH
+            if pos == 0 or text[pos - 1] in FuzzyMatcher.BOUNDARIES:
+                score += FuzzyMatcher.BONUS_BOUNDARY
+            if previous is not None:
+                gap = pos - previous - 1
+                if gap == 0:
+                    score += FuzzyMatcher.BONUS_CONSECUTIVE
+                else:
+                    score -= FuzzyMatcher.PENALTY_GAP_START + (gap - 1) * FuzzyMatcher.PENALTY_GAP_EXTENSION
+            previous = pos
+
+        if positions[0] == 0 or text[positions[0] - 1] == '\n':
+            score += FuzzyMatcher.BONUS_FIRST_CHAR
+        return score, positions
+
+    @staticmethod
+    def highlight(text: str, positions: tuple[int, ...], match_style: CompiledStyle, restore: str = '') -> str:
+        '''
+            Styles the characters of the text at the matched positions, restore is
+            written after every match so the surrounding style carries on after 
+            the match style was reset.
+        '''
+        if not positions:
+            return text
+        chars = list(text)
+        for pos in positions:
+            if pos < len(chars):
+                chars[pos] = f'{ match_style(chars[pos]) }{ restore }'
+        return ''.join(chars)
@@ -0,0 +1,251 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterable, Callable, Iterable, Sequence
+
+
+class OptionSource:
+    '''
+        Base class for where a PagedMenu gets its options from.
+
+        Options are requested a page at a time and only the most recently used
+        pages are kept in a small LRU cache, so a menu over millions of generated
+        or remote-backed entries starts instantly and uses constant memory.
+
+        Subclasses implement fetch_page() and, when it is cheap to know, count().
+        When the count is unknown the end of the options is discovered the first
+        time a page comes back shorter than the page size.
+
+        PAGE_CACHE_SIZE: int: The default number of pages kept in the cache.
+    '''
+    PAGE_CACHE_SIZE: int = 8
+
+    def __init__(self, page_cache_size: int = PAGE_CACHE_SIZE) -> None:
+        self.page_cache: OrderedDict[tuple[int, int], list[str]] = OrderedDict()
+        self.page_cache_size: int = page_cache_size
+        self.end_count: int = None
+
+    @staticmethod
+    def wrap(options) -> 'OptionSource':
+        '''
+            Returns the OptionSource for the options passed to a menu, which can be
+            an OptionSource, a sequence, a provider object with a get_page(index, size)
+            and an optional count() method, a get_page(index, size) callable or an
+            iterator / async iterator that is streamed in the background.
+        '''
+        if isinstance(options, OptionSource):
+            return options
+
+        if isinstance(options, Sequence):
+            return SequenceSource(options)
+
+        if hasattr(options, 'get_page'):
+            return CallableSource(options.get_page, getattr(options, 'count', None))
+
+        if callable(options):
+            return CallableSource(options)
+
+        if StreamingSource.accepts(options):
+            return StreamingSource(options)
+
+        raise TypeError(f'[ ERROR ] Cannot use { type(options).__name__ } as menu options.')
+
+    def fetch_page(self, index: int, size: int) -> list[str]:
+        raise NotImplementedError('ERROR: Called on Base Class, Subclasses must implement this method')
+
+    def count(self) -> int:
+        '''
+            Returns the number of options or None if it is not known (yet).
+        '''
+        return self.end_count
+
+    @property
+    def loading(self) -> bool:
+        '''
+            True while options are still being added, count() is 
+            then the number of options loaded so far.
+        '''
+        return False
+
+    def get_page(self, index: int, size: int) -> list[str]:
+        '''
+            Returns the options on the 0-based page index passed, pages are only
+            fetched once while they remain in the cache.
+        '''
+        key = (index, size)
+        page = self.page_cache.get(key)
+        if page is not None:
+            self.page_cache.move_to_end(key)
+            return page
+
+        page = list(self.fetch_page(index, size))
+        if len(page) < size:
+            self.end_count = index * size + len(page)
+
+        self.page_cache[key] = page
+        if len(self.page_cache) > self.page_cache_size:
+            self.page_cache.popitem(last=False)
+        return page
+
+    def __bool__(self) -> bool:
+        count = self.count()
+        if count is not None:
+            return count > 0
+        return len(self.get_page(0, 1)) > 0
+
+
+class SequenceSource(OptionSource):
+    '''
+        Options backed by anything with __len__ and __getitem__, only the items
+        on the requested page are read. The source is itself sequence-like so a
+        menu's options can still be indexed and measured.
+    '''
+
+    def __init__(self, options: Sequence[str], page_cache_size: int = OptionSource.PAGE_CACHE_SIZE) -> None:
+        super().__init__(page_cache_size)
+        self.options: Sequence[str] = options
+
+    def fetch_page(self, index: int, size: int) -> list[str]:
+        start = index * size
+        end = min(start + size, len(self.options))
+        return [self.options[idx] for idx in range(start, end)]
+
+    def count(self) -> int:
+        return len(self.options)
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def __getitem__(self, idx):
+        return self.options[idx]
+
+
+class CallableSource(OptionSource):
+    '''
+        Options produced by a get_page(index, size) callable, such as a generator
+        function or a paginated remote API, with an optional count() callable.
+    '''
+
+    def __init__(self, get_page: Callable[[int, int], list[str]], count: Callable[[], int] = None,
+    page_cache_size: int = OptionSource.PAGE_CACHE_SIZE) -> None:
+        super().__init__(page_cache_size)
+        self.page_provider: Callable[[int, int], list[str]] = get_page
+        self.count_provider: Callable[[], int] = count
+        self.known_count: int = None
+
+    def fetch_page(self, index: int, size: int) -> list[str]:
+        return self.page_provider(index, size)
+
+    def count(self) -> int:
+        if self.known_count is None and self.count_provider:
+            self.known_count = self.count_provider()
+        return self.known_count if self.known_count is not None else self.end_count
+
+
+class StreamingSource(OptionSource):
+    '''
+        Options consumed from an iterator or async iterator in the background, so
+        a menu over a slow producer (a directory walk, a paginated export) is 
+        interactive right away and shows the options loaded so far.
+
+        Sync iterators are consumed by a daemon thread, async iterators by a task
+        on the running event loop (or on a private loop in a thread when there is
+        none). Options are only ever appended so readers always see a consistent
+        prefix without locking, menus pick up what was added since their last 
+        frame every REFRESH_INTERVAL seconds.
+
+        An exception raised by the producer ends the loading and is kept in error.
+
+        REFRESH_INTERVAL: float: How often a menu repaints while options load.
+    '''
+    REFRESH_INTERVAL: float = 0.1
+
+    @staticmethod
+    def accepts(options) -> bool:
+        '''
+            Returns True for iterables that can't be indexed, 
+            which menus stream instead of reading up front.
+        '''
+        if isinstance(options, (Sequence, OptionSource)):
+            return False
+        return isinstance(options, (Iterable, AsyncIterable))
+
+    def __init__(self, options: Iterable[str] | AsyncIterable[str]) -> None:
+        super().__init__()
+        self.items: list[str] = []
+        self.error: BaseException = None
+        self.done: bool = False
+        self.stopped: bool = False
+        self.task: asyncio.Task = None
+        self.thread: threading.Thread = None
+        self.__start(options)
+
+    def __start(self, options) -> None:
+        if not isinstance(options, AsyncIterable):
+            self.thread = threading.Thread(target=self.__consume, args=(options,), daemon=True)
+            self.thread.start()
+            return
+
+        try:
+            self.task = asyncio.get_running_loop().create_task(self.__consume_async(options))
+        except RuntimeError:
+            self.thread = threading.Thread(
+                target=asyncio.run, args=(self.__consume_async(options),), daemon=True
+            )
+            self.thread.start()
+
+    def __consume(self, options: Iterable[str]) -> None:
+        try:
+            for option in options:
+                if self.stopped:
+                    break
+                self.items.append(option)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.done = True
+
+    async def __consume_async(self, options: AsyncIterable[str]) -> None:
+        try:
+            async for option in options:
+                if self.stopped:
+                    break
+                self.items.append(option)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.done = True
+
+    def stop(self) -> None:
+        '''
+            Stops consuming the producer, the options loaded so far are kept.
+        '''
+        self.stopped = True
+        if self.task:
+            self.task.cancel()
+
+    @property
+    def loading(self) -> bool:
+        return not self.done
+
+    def count(self) -> int:
+        return len(self.items)
+
+    def fetch_page(self, index: int, size: int) -> list[str]:
+        return self.items[index * size : (index + 1) * size]
+
+    def get_page(self, index: int, size: int) -> list[str]:
+        '''
+            Pages are sliced from the loaded options and not cached,
+            a cached page could miss options added since.
+        '''
+        return self.fetch_page(index, size)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, idx):
+        return self.items[idx]
+
+    def __bool__(self) -> bool:
+        return self.loading or len(self.items) > 0
@@ -0,0 +1,848 @@
+import asyncio
+import atexit
+import codecs
+import collections
+import contextlib
+import os
+import queue
+import selectors
+import shutil
+import signal
+import sys
+import threading
+import time
+from colorify import ConsoleStencil
+
+if os.name != 'nt':
+    import termios
+    import tty
+
+
+CURSOR_HOME = '\033[H'
+CLEAR_SCREEN = '\033[2J'
+CLEAR_LINE = '\033[K'
+HIDE_CURSOR = '\033[?25l'
+SHOW_CURSOR = '\033[?25h'
+ALT_SCREEN_ON = '\033[?1049h'
+ALT_SCREEN_OFF = '\033[?1049l'
+RESET_SCROLL_REGION = '\033[r'
+
+
+def scroll_region(top: int, bottom: int) -> str:
+    '''
+        Limits scrolling to rows top through bottom (1-based).
+    '''
+    return f'\033[{ top };{ bottom }r'
+
+
+def move_cursor(row: int, col: int = 1) -> str:
+    '''
+        Returns the escape sequence that moves the cursor to the 1-based
+        row and column passed.
+    '''
+    return f'\033[{ row };{ col }H'
+
+
+class TerminalSession:
+    '''
+        Owns the console while a menu or viewer is running.
+
+        Entering the session switches to the alternate screen and hides the 
+        cursor, leaving it (or an exception / interpreter exit) restores the
+        terminal. Clearing is done with escape sequences instead of spawning
+        'cls' / 'clear' and everything written during a frame is collected in
+        a buffer that is sent to the console with a single write call.
+
+        Sessions are re-entrant, nested menus sharing a session only restore 
+        the terminal once the outermost one exits. Every widget uses the shared
+        SESSION unless it is given its own.
+
+        generation: int: Incremented whenever the screen is wiped so that 
+        renderers know their last frame is gone.
+
+        renderer: FrameRenderer: The renderer that drew the screen last, a 
+        renderer repaints everything once another one (a nested menu) drew.
+    '''
+
+    def __init__(self, stream=None, alternate_screen: bool = True) -> None:
+        self.stream = stream if stream else sys.stdout
+        self.alternate_screen: bool = alternate_screen
+        self.depth: int = 0
+        self.generation: int = 0
+        self.renderer: FrameRenderer = None
+        self.buffer: list[str] = []
+
+    @property
+    def active(self) -> bool:
+        return self.depth > 0
+
+    def __enter__(self) -> 'TerminalSession':
+        if self.depth == 0:
+            self.__setup()
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.depth -= 1
+        if self.depth == 0:
+            self.restore()
+        return False
+
+    def __setup(self) -> None:
+        if self.alternate_screen:
+            self.write(ALT_SCREEN_ON)
+        self.write(HIDE_CURSOR)
+        self.clear()
+        atexit.register(self.restore)
+
+    def restore(self) -> None:
+        '''
+            Shows the cursor and leaves the alternate screen, safe to 
+            call more than once.
+        '''
+        atexit.unregister(self.restore)
+        self.buffer.clear()
+        self.write(SHOW_CURSOR)
+        if self.alternate_screen:
+            self.write(ALT_SCREEN_OFF)
+        self.flush()
+        self.depth = 0
+
+    def write(self, text: str) -> None:
+        '''
+            Adds text to the frame buffer, nothing reaches 
+            the console until flush() is called.
+        '''
+        self.buffer.append(text)
+
+    def flush(self) -> None:
+        '''
+            Writes the buffered frame to the console with a single write call.
+        '''
+        if not self.buffer:
+            return
+        self.stream.write(''.join(self.buffer))
+        self.stream.flush()
+        self.buffer.clear()
+
+    def clear(self) -> None:
+        self.write(f'{ CURSOR_HOME }{ CLEAR_SCREEN }')
+        self.flush()
+        self.generation += 1
+
+
+# shared by every menu and viewer so a widget opened from another one nests in its session
+SESSION = TerminalSession()
+
+
+class FrameRenderer:
+    '''
+        A screen-buffer compositor for the console menus.
+
+        Instead of clearing the console and re-printing every row on every
+        keypress, the renderer keeps the last frame it wrote and only rewrites
+        the rows that changed using cursor addressing. Moving the highlight in a
+        menu therefore only costs the two rows whose selection changed.
+
+        last_frame: list[str]: The rows written by the previous render.
+
+        full_repaint: bool: When True the next render clears the screen and
+        writes every row (first frame, after invalidate() or after the session
+        cleared the screen).
+    '''
+
+    def __init__(self, session: TerminalSession = None) -> None:
+        self.session: TerminalSession = session if session else SESSION
+        self.last_frame: list[str] = []
+        self.full_repaint: bool = True
+        self.generation: int = self.session.generation
+
+    def invalidate(self) -> None:
+        '''
+            Forces the next render to clear the screen and repaint every row,
+            used when something other than the renderer wrote to the console.
+        '''
+        self.full_repaint = True
+
+    def scroll(self, top: int, bottom: int, lines: int) -> None:
+        '''
+            Scrolls rows top through bottom (1-based) up by lines with the terminal's
+            scroll region, so when content moves up (a tailed log) the next render 
+            only writes the rows that are new instead of every row.
+
+            Does nothing when the next render repaints everything anyway.
+        '''
+        screen_wiped = self.generation != self.session.generation
+        if self.full_repaint or screen_wiped or self.session.renderer is not self or bottom > len(self.last_frame):
+            return
+        if not 0 < lines <= bottom - top:
+            return
+
+        newlines = '\n' * lines
+        self.session.write(f'{ scroll_region(top, bottom) }{ move_cursor(bottom) }{ newlines }{ RESET_SCROLL_REGION }')
+        region = self.last_frame[top - 1 : bottom]
+        self.last_frame[top - 1 : bottom] = region[lines:] + [''] * lines
+
+    @staticmethod
+    def split_rows(rows: list[str]) -> list[str]:
+        '''
+            Flattens the rows passed so that each entry is exactly one line
+            on the screen, rows containing new lines are split.
+        '''
+        return '\n'.join(rows).split('\n') if rows else []
+
+    def render(self, rows: list[str]) -> None:
+        '''
+            Writes the frame passed to the console, only rewriting the rows
+            that differ from the previous frame and erasing rows that are
+            no longer used. Rows wider than the terminal are truncated so 
+            they never wrap onto the row below, and rows below the screen are
+            dropped so the last row stays free for the parked cursor.
+
+            Args:
+                rows (list[str]): The rows of the frame from top to bottom.
+        '''
+        columns, lines = terminal_size()
+        visible = FrameRenderer.split_rows(rows)[: max(1, lines - 1)]
+        frame = [ConsoleStencil.truncate(row, columns) for row in visible]
+        if self.session.renderer is not self:
+            self.full_repaint = True
+        output = []
+        previous = self.last_frame
+        screen_wiped = self.generation != self.session.generation
+        if self.full_repaint and not screen_wiped:
+            output.append(f'{ CURSOR_HOME }{ CLEAR_SCREEN }')
+        if self.full_repaint or screen_wiped:
+            previous = []
+
+        for idx, row in enumerate(frame):
+            if idx < len(previous) and previous[idx] == row:
+                continue
+            output.append(f'{ move_cursor(idx + 1) }{ row }{ CLEAR_LINE }')
+
+        for idx in range(len(frame), min(len(previous), lines)):
+            output.append(f'{ move_cursor(idx + 1) }{ CLEAR_LINE }')
+
+        output.append(move_cursor(min(len(frame) + 1, lines)))
+        self.session.write(''.join(output))
+        self.session.flush()
+        self.last_frame = frame
+        self.full_repaint = False
+        self.generation = self.session.generation
+        self.session.renderer = self
+
+
+class FrameClock:
+    '''
+        Caps how often a UI loop renders, input that arrives before the next
+        frame is due is applied without drawing the frames in between.
+
+        max_fps: int: The maximum number of frames per second, 0 or None
+        renders after every batch of input.
+    '''
+    DEFAULT_FPS: int = 60
+
+    def __init__(self, max_fps: int = DEFAULT_FPS) -> None:
+        self.interval: float = 1 / max_fps if max_fps else 0.0
+        self.last_frame: float = 0.0
+
+    def tick(self) -> None:
+        '''
+            Records that a frame was just rendered.
+        '''
+        self.last_frame = time.monotonic()
+
+    def remaining(self) -> float:
+        '''
+            Seconds until the next frame may be rendered.
+        '''
+        return max(0.0, self.last_frame + self.interval - time.monotonic())
+
+
+KEY_DOWN = 'down'
+
+# the name of the event input backends report after the terminal was resized
+KEY_RESIZE = 'resize'
+
+
+class ResizeMonitor:
+    '''
+        Watches for terminal resizes (SIGWINCH) on behalf of every widget.
+
+        The signal handler only writes a byte to a self-pipe, the input backend 
+        waits on the pipe next to the terminal and turns a burst of signals into
+        one KEY_RESIZE event once the size stopped changing for DEBOUNCE seconds
+        (or after MAX_DELAY while it keeps changing), so dragging a pane edge 
+        repaints a few times instead of on every signal.
+
+        While the monitor is active terminal_size() is cached and only read
+        again after a resize.
+
+        DEBOUNCE: float: How long the size has to stay the same.
+
+        MAX_DELAY: float: The longest a repaint is held back during a resize.
+    '''
+    DEBOUNCE: float = 0.05
+    MAX_DELAY: float = 0.25
+
+    def __init__(self) -> None:
+        self.read_fd: int = None
+        self.write_fd: int = None
+        self.depth: int = 0
+        self.previous_handler = None
+        self.size: os.terminal_size = None
+
+    @property
+    def active(self) -> bool:
+        return self.depth > 0
+
+    def __enter__(self) -> 'ResizeMonitor':
+        if self.depth == 0:
+            self.read_fd, self.write_fd = os.pipe()
+            os.set_blocking(self.read_fd, False)
+            os.set_blocking(self.write_fd, False)
+            # signal handlers can only be installed from the main thread
+            if hasattr(signal, 'SIGWINCH') and threading.current_thread() is threading.main_thread():
+                self.previous_handler = signal.signal(signal.SIGWINCH, self.__on_resize)
+        self.size = None
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.depth -= 1
+        if self.depth == 0:
+            if self.previous_handler is not None:
+                signal.signal(signal.SIGWINCH, self.previous_handler)
+                self.previous_handler = None
+            os.close(self.read_fd)
+            os.close(self.write_fd)
+            self.read_fd = self.write_fd = None
+        return False
+
+    def __on_resize(self, signum, frame) -> None:
+        self.size = None
+        try:
+            os.write(self.write_fd, b'\0')
+        except (BlockingIOError, TypeError):
+            # the pipe is full (a resize is already pending) or was just closed
+            pass
+        if callable(self.previous_handler):
+            self.previous_handler(signum, frame)
+
+    def drain(self) -> None:
+        try:
+            while os.read(self.read_fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def terminal_size(self) -> os.terminal_size:
+        if not self.active:
+            return shutil.get_terminal_size()
+        if self.size is None:
+            self.size = shutil.get_terminal_size()
+        return self.size
+
+
+RESIZE_MONITOR = ResizeMonitor()
+
+
+def terminal_size() -> os.terminal_size:
+    '''
+        Returns the size of the terminal, cached between resizes 
+        while a menu is reading keys.
+    '''
+    return RESIZE_MONITOR.terminal_size()
+
+
+class KeyEvent:
+    '''
+        A key-down event, the names follow the keyboard library ('up', 'enter', 
+        'backspace', 'esc', 'space', 'a', ...) so handle_keys() works with any
+        input backend.
+    '''
+    __slots__ = ('name', 'event_type')
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.event_type: str = KEY_DOWN
+
+    def __repr__(self) -> str:
+        return f'KeyEvent({ self.name !r})'
+
+
+class KeyDecoder:
+    '''
+        A small state machine that turns the characters read from a terminal
+        into key events, decoding arrow / navigation escape sequences.
+
+        A lone escape can't be told apart from the start of a sequence until 
+        more input arrives, pending is True while that's undecided and flush()
+        turns it into an 'esc' key once the backend gives up waiting.
+    '''
+    CONTROL_KEYS: dict[str, str] = {
+        '\r': 'enter', '\n': 'enter', '\x7f': 'backspace', '\x08': 'backspace', 
+        '\t': 'tab', ' ': 'space'
+    }
+
+    SEQUENCE_KEYS: dict[str, str] = {
+        'A': 'up', 'B': 'down', 'C': 'right', 'D': 'left', 'H': 'home', 'F': 'end',
+        '2~': 'insert', '3~': 'delete', '5~': 'page up', '6~': 'page down', 
+        '1~': 'home', '4~': 'end', '7~': 'home', '8~': 'end'
+    }
+
+    GROUND, ESCAPE, SEQUENCE = range(3)
+
+    def __init__(self) -> None:
+        self.state: int = KeyDecoder.GROUND
+        self.sequence: str = ''
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    @property
+    def pending(self) -> bool:
+        return self.state != KeyDecoder.GROUND
+
+    def feed(self, data: bytes) -> list[KeyEvent]:
+        events = []
+        for char in self.decoder.decode(data):
+            self.__step(char, events)
+        return events
+
+    def flush(self) -> list[KeyEvent]:
+        '''
+            Gives up on an unfinished escape sequence, a lone escape 
+            becomes the 'esc' key and anything else is dropped.
+        '''
+        events = [KeyEvent('esc')] if self.state == KeyDecoder.ESCAPE else []
+        self.state = KeyDecoder.GROUND
+        self.sequence = ''
+        return events
+
+    def __step(self, char: str, events: list[KeyEvent]) -> None:
+        if self.state == KeyDecoder.ESCAPE:
+            if char in '[O':
+                self.state = KeyDecoder.SEQUENCE
+                return
+            events.append(KeyEvent('esc'))
+            self.state = KeyDecoder.GROUND
+
+        elif self.state == KeyDecoder.SEQUENCE:
+            # parameters are digits and ';', anything in '@'..'~' ends the sequence
+            if not '@' <= char <= '~':
+                self.sequence += char
+                return
+            name = self.__sequence_name(self.sequence, char)
+            if name:
+                events.append(KeyEvent(name))
+            self.state = KeyDecoder.GROUND
+            self.sequence = ''
+            return
+
+        if char == '\x1b':
+            self.state = KeyDecoder.ESCAPE
+
+        elif char == '\x03':
+            raise KeyboardInterrupt
+
+        elif char in KeyDecoder.CONTROL_KEYS:
+            events.append(KeyEvent(KeyDecoder.CONTROL_KEYS[char]))
+
+        elif char.isprintable():
+            events.append(KeyEvent(char))
+
+    @staticmethod
+    def __sequence_name(params: str, final: str) -> str:
+        if final == '~':
+            # drop modifiers such as ctrl / shift ('5;5~' -> '5~')
+            return KeyDecoder.SEQUENCE_KEYS.get(f'{ params.split(";")[0] }~')
+        return KeyDecoder.SEQUENCE_KEYS.get(final)
+
+
+class KeyInput:
+    '''
+        Base class for the input backends used by the menus, entering the backend
+        prepares the terminal for reading single keys and leaving it restores it.
+
+        Backends only ever return key-down events.
+
+        ASYNC_POLL_INTERVAL: float: How often read_keys_async() checks backends 
+        that can't be watched by the event loop.
+    '''
+    ASYNC_POLL_INTERVAL: float = 0.01
+
+    def __init__(self) -> None:
+        self.queue: collections.deque[KeyEvent] = collections.deque()
+
+    def __enter__(self) -> 'KeyInput':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+    def read_keys(self, timeout: float = None) -> list[KeyEvent]:
+        '''
+            Waits up to timeout seconds (forever if None) for input and returns
+            every key that is available, an empty list on timeout.
+        '''
+        raise NotImplementedError('ERROR: Called on Base Class, Subclasses must implement this method')
+
+    def read_key(self) -> KeyEvent:
+        '''
+            Blocks until a key is pressed and returns it.
+        '''
+        while not self.queue:
+            self.queue.extend(self.read_keys())
+        return self.queue.popleft()
+
+    def read_batch(self, clock: FrameClock = None, timeout: float = None) -> list[KeyEvent]:
+        '''
+            Blocks until a key is pressed and returns every key that arrived until
+            the next frame is due, so a burst of auto-repeated keys is applied at 
+            once and rendered as a single frame.
+
+            With a timeout an empty list is returned when no key was pressed in 
+            time, letting the caller repaint for changes that aren't key presses.
+        '''
+        events = list(self.queue)
+        self.queue.clear()
+        if not events:
+            events = self.read_keys(timeout)
+            if not events:
+                return events
+
+        delay = clock.remaining() if clock else 0.0
+        while delay > 0:
+            events.extend(self.read_keys(delay))
+            delay = clock.remaining()
+        events.extend(self.read_keys(0))
+        return events
+
+    async def read_keys_async(self, timeout: float = None) -> list[KeyEvent]:
+        '''
+            Awaitable read_keys(), other tasks keep running while no key is pressed. 
+            Backends that can't be watched by the event loop poll every 
+            ASYNC_POLL_INTERVAL seconds.
+        '''
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            events = self.read_keys(0)
+            if events or (deadline is not None and loop.time() >= deadline):
+                return events
+            await asyncio.sleep(KeyInput.ASYNC_POLL_INTERVAL)
+
+    async def read_batch_async(self, clock: FrameClock = None, timeout: float = None) -> list[KeyEvent]:
+        '''
+            Awaitable read_batch().
+        '''
+        events = list(self.queue)
+        self.queue.clear()
+        if not events:
+            events = await self.read_keys_async(timeout)
+            if not events:
+                return events
+
+        delay = clock.remaining() if clock else 0.0
+        while delay > 0:
+            events.extend(await self.read_keys_async(delay))
+            delay = clock.remaining()
+        events.extend(self.read_keys(0))
+        return events
+
+    @contextlib.contextmanager
+    def suspended(self):
+        '''
+            Restores the normal terminal mode for the duration of the block,
+            for callbacks that use input() or print a prompt.
+        '''
+        yield
+
+
+class RawTTYInput(KeyInput):
+    '''
+        Reads keys straight from the controlling terminal (/dev/tty), so the menus
+        run unprivileged and only see keys typed into their own terminal.
+
+        The terminal is switched to cbreak mode: input is unbuffered and not echoed
+        while output processing and Ctrl+C keep working. Input is waited on with a
+        selector, so there is no polling and no fixed sleep between keys.
+
+        Terminal resizes are reported as a single KEY_RESIZE event once the 
+        window stopped changing size (see ResizeMonitor).
+
+        ESCAPE_TIMEOUT: float: How long to wait for the rest of an escape sequence
+        before treating it as a lone 'esc' key.
+    '''
+    ESCAPE_TIMEOUT: float = 0.05
+
+    def __init__(self, path: str = '/dev/tty') -> None:
+        super().__init__()
+        self.path: str = path
+        self.fd: int = None
+        self.depth: int = 0
+        self.saved_mode: list = None
+        self.selector: selectors.BaseSelector = None
+        self.decoder: KeyDecoder = KeyDecoder()
+
+    def __enter__(self) -> 'RawTTYInput':
+        if self.depth == 0:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_NOCTTY)
+            self.saved_mode = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+            RESIZE_MONITOR.__enter__()
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.fd, selectors.EVENT_READ)
+            self.selector.register(RESIZE_MONITOR.read_fd, selectors.EVENT_READ)
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.depth -= 1
+        if self.depth == 0:
+            self.selector.close()
+            RESIZE_MONITOR.__exit__(None, None, None)
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved_mode)
+            os.close(self.fd)
+            self.fd = None
+        return False
+
+    @contextlib.contextmanager
+    def suspended(self):
+        if self.fd is None:
+            yield
+            return
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved_mode)
+        try:
+            yield
+        finally:
+            tty.setcbreak(self.fd)
+
+    def __wait(self, timeout: float) -> set[int]:
+        '''
+            Returns the descriptors (terminal and resize pipe) that are readable.
+        '''
+        return {key.fd for key, _ in self.selector.select(timeout)}
+
+    def __read_tty(self, events: list[KeyEvent]) -> None:
+        while True:
+            events.extend(self.decoder.feed(os.read(self.fd, 4096)))
+            if self.decoder.pending and self.fd in self.__wait(RawTTYInput.ESCAPE_TIMEOUT):
+                continue
+            if self.fd not in self.__wait(0):
+                break
+        events.extend(self.decoder.flush())
+
+    def __debounce_resize(self) -> KeyEvent:
+        '''
+            Waits until no resize signal arrived for ResizeMonitor.DEBOUNCE seconds
+            (at most MAX_DELAY) so dragging a pane edge causes a single repaint.
+        '''
+        deadline = time.monotonic() + ResizeMonitor.MAX_DELAY
+        RESIZE_MONITOR.drain()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or RESIZE_MONITOR.read_fd not in self.__wait(min(ResizeMonitor.DEBOUNCE, remaining)):
+                break
+            RESIZE_MONITOR.drain()
+        return KeyEvent(KEY_RESIZE)
+
+    def read_keys(self, timeout: float = None) -> list[KeyEvent]:
+        if self.fd is None:
+            with self:
+                return self.read_keys(timeout)
+
+        events = list(self.queue)
+        self.queue.clear()
+        if events:
+            return events
+
+        ready = self.__wait(timeout)
+        if RESIZE_MONITOR.read_fd in ready:
+            events.append(self.__debounce_resize())
+        if self.fd in ready:
+            self.__read_tty(events)
+        return events
+
+    async def __readable(self, timeout: float, fds: tuple[int, ...]) -> set[int]:
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        readable = set()
+
+        def on_readable(fd: int) -> None:
+            readable.add(fd)
+            if not ready.done():
+                ready.set_result(True)
+
+        for fd in fds:
+            loop.add_reader(fd, on_readable, fd)
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for fd in fds:
+                loop.remove_reader(fd)
+        return readable
+
+    async def read_keys_async(self, timeout: float = None) -> list[KeyEvent]:
+        '''
+            Waits for the terminal with an event loop reader instead of 
+            a selector, so waiting takes no thread.
+        '''
+        if self.fd is None:
+            with self:
+                return await self.read_keys_async(timeout)
+
+        events = list(self.queue)
+        self.queue.clear()
+        if events or timeout == 0:
+            return events or self.read_keys(0)
+
+        resize_fd = RESIZE_MONITOR.read_fd
+        ready = await self.__readable(timeout, (self.fd, resize_fd))
+        if resize_fd in ready:
+            deadline = time.monotonic() + ResizeMonitor.MAX_DELAY
+            RESIZE_MONITOR.drain()
+            while time.monotonic() < deadline and await self.__readable(ResizeMonitor.DEBOUNCE, (resize_fd,)):
+                RESIZE_MONITOR.drain()
+            events.append(KeyEvent(KEY_RESIZE))
+
+        if self.fd not in ready:
+            return events
+        while True:
+            events.extend(self.decoder.feed(os.read(self.fd, 4096)))
+            if self.decoder.pending and await self.__readable(RawTTYInput.ESCAPE_TIMEOUT, (self.fd,)):
+                continue
+            if self.fd not in self.__wait(0):
+                break
+        events.extend(self.decoder.flush())
+        return events
+
+
+class WindowsConsoleInput(KeyInput):
+    '''
+        Reads keys from the Windows console with msvcrt, arrow and navigation 
+        keys arrive as a '\\x00' / '\\xe0' prefix followed by a scan code.
+        Console resizes are reported as KEY_RESIZE events.
+    '''
+    SCAN_CODES: dict[str, str] = {
+        'H': 'up', 'P': 'down', 'K': 'left', 'M': 'right', 'G': 'home', 'O': 'end',
+        'I': 'page up', 'Q': 'page down', 'R': 'insert', 'S': 'delete'
+    }
+
+    CONTROL_KEYS: dict[str, str] = {
+        '\r': 'enter', '\x08': 'backspace', '\x1b': 'esc', '\t': 'tab', ' ': 'space'
+    }
+
+    # msvcrt can't wait on the console, kbhit() is checked at this interval instead
+    POLL_INTERVAL: float = 0.005
+
+    def __init__(self) -> None:
+        super().__init__()
+        import msvcrt
+        self.msvcrt = msvcrt
+        self.size: os.terminal_size = shutil.get_terminal_size()
+        self.resized_at: float = None
+
+    def __resized(self) -> bool:
+        '''
+            There is no resize signal on Windows, the console size is checked
+            while polling and reported once it stayed the same for 
+            ResizeMonitor.DEBOUNCE seconds.
+        '''
+        size = shutil.get_terminal_size()
+        if size != self.size:
+            self.size, self.resized_at = size, time.monotonic()
+            return False
+        if self.resized_at is not None and time.monotonic() - self.resized_at >= ResizeMonitor.DEBOUNCE:
+            self.resized_at = None
+            return True
+        return False
+
+    def __read(self) -> KeyEvent:
+        char = self.msvcrt.getwch()
+        if char in '\x00\xe0':
+            name = WindowsConsoleInput.SCAN_CODES.get(self.msvcrt.getwch())
+            return KeyEvent(name) if name else None
+        if char == '\x03':
+            raise KeyboardInterrupt
+        if char in WindowsConsoleInput.CONTROL_KEYS:
+            return KeyEvent(WindowsConsoleInput.CONTROL_KEYS[char])
+        return KeyEvent(char) if char.isprintable() else None
+
+    def read_keys(self, timeout: float = None) -> list[KeyEvent]:
+        events = list(self.queue)
+        self.queue.clear()
+        if events:
+            return events
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.msvcrt.kbhit():
+            if self.__resized():
+                return [KeyEvent(KEY_RESIZE)]
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+            time.sleep(WindowsConsoleInput.POLL_INTERVAL)
+
+        while self.msvcrt.kbhit():
+            event = self.__read()
+            if event:
+                events.append(event)
+        return events
+
+
+class KeyboardLibraryInput(KeyInput):
+    '''
+        The previous backend built on the global hook of the keyboard library,
+        it needs root on Linux and sees every key on the system so it is only
+        used when asked for explicitly.
+    '''
+
+    def __init__(self) -> None:
+        super().__init__()
+        import keyboard
+        self.keyboard = keyboard
+        self.events: queue.SimpleQueue[KeyEvent] = queue.SimpleQueue()
+        self.hook = None
+
+    def __enter__(self) -> 'KeyboardLibraryInput':
+        if self.hook is None:
+            self.hook = self.keyboard.hook(self.__on_event)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if self.hook is not None:
+            self.keyboard.unhook(self.hook)
+            self.hook = None
+        return False
+
+    def __on_event(self, event) -> None:
+        if event.event_type == self.keyboard.KEY_DOWN:
+            self.events.put(KeyEvent(event.name))
+
+    def read_keys(self, timeout: float = None) -> list[KeyEvent]:
+        if self.hook is None:
+            with self:
+                return self.read_keys(timeout)
+
+        events = list(self.queue)
+        self.queue.clear()
+        if events:
+            return events
+
+        try:
+            events.append(self.events.get(timeout=timeout))
+        except queue.Empty:
+            return []
+        while not self.events.empty():
+            events.append(self.events.get_nowait())
+        return events
+
+
+def default_input() -> KeyInput:
+    '''
+        Returns the input backend for the current platform.
+    '''
+    if os.name == 'nt':
+        return WindowsConsoleInput()
+    return RawTTYInput()
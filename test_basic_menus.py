@@ -0,0 +1,21 @@
+import io
+from basic_menus import PagedMenu
+from terminal import TerminalSession
+from test_terminal import ScriptedInput
+
+
+def run_menu(menu, keys: list[str]) -> str:
+    menu.key_input = ScriptedInput(keys)
+    return menu.run()
+
+
+def test_filterable_paged_menu_runs_without_a_query():
+    options = [f'z{ idx }' for idx in range(23)]
+    menu = PagedMenu(options, 'P', page_size=5, filterable=True, session=TerminalSession(io.StringIO()))
+    assert run_menu(menu, ['right', 'down', 'enter']) == 'z6'
+
+
+def test_filterable_paged_menu_filters_by_prefix():
+    options = [f'z{ idx }' for idx in range(23)]
+    menu = PagedMenu(options, 'P', page_size=5, filterable=True, session=TerminalSession(io.StringIO()))
+    assert run_menu(menu, ['z', '2', 'down', 'enter']) == 'z20'
@@ -1,5 +1,8 @@
-from colorify import ConsoleStencil
+from colorify import ConsoleStencil, KeywordHighlighter
+import io
+import re
 import unittest
+import timeit
 from colorama import Fore, Back, Style, init
 init(autoreset=True)
 
@@ -15,6 +18,7 @@ init(autoreset=True)
 # -bg_colorize
 # -colorize
 # -ansify
+# -compile
 
 
 def test_color_phrase():
@@ -49,7 +53,116 @@ def multi_style():
     print(ConsoleStencil.multi_style("Hello, World! (info: fg_color='magenta', bg_color='cyan', ansi=italic)'", fg_color='magenta', bg_color='cyan', ansi='italic'))
     print(ConsoleStencil.multi_style("Hello, World! (info: fg_color='white', bg_color='black', style=bright)'", fg_color='white', bg_color='black', style='bright'))
     
+
+def legacy_multi_style(text: str, **kwargs) -> str:
+    # multi_style() as it was before ConsoleStencil.compile(), kept as the benchmark baseline
+    styled_text = text
+    for key, value in kwargs.items():
+        value = value.lower()
+        if key == 'fg_color' and value in ConsoleStencil.VALID_COLORS:
+            styled_text = f"{ ConsoleStencil.COLOR_MAP[value] } { styled_text }"
+        elif key == 'bg_color' and value in ConsoleStencil.VALID_COLORS:
+            styled_text = f"{ ConsoleStencil.BACKGROUND_MAP[value] } { styled_text }"
+        elif key == 'ansi' and value in ConsoleStencil.VALID_ANSI_STYLES:
+            styled_text = f"{ ConsoleStencil.ANSI_STYLE_MAP[value] } { styled_text } { ConsoleStencil.ANSI_STYLE_MAP['normal'] }"
+        elif key == 'style' and value in ConsoleStencil.VALID_STYLES:
+            styled_text = f"{ ConsoleStencil.STYLE_MAP[value] } { styled_text }"
+    return f'{ styled_text } { Style.RESET_ALL }'
+
+def compile_benchmark():
+    kwargs = {'fg_color': 'black', 'bg_color': 'white', 'ansi': 'bold', 'style': 'bright'}
+    compiled = ConsoleStencil.compile(**kwargs)
+    assert compiled('Option') == legacy_multi_style('Option', **kwargs)
+    runs = 200_000
+    legacy = timeit.timeit(lambda: legacy_multi_style('Option', **kwargs), number=runs)
+    wrapper = timeit.timeit(lambda: ConsoleStencil.multi_style('Option', **kwargs), number=runs)
+    handle = timeit.timeit(lambda: compiled('Option'), number=runs)
+    print(f'legacy multi_style : { legacy:.3f}s')
+    print(f'multi_style        : { wrapper:.3f}s ({ legacy / wrapper:.1f}x)')
+    print(f'compiled handle    : { handle:.3f}s ({ legacy / handle:.1f}x)')
+
+def legacy_rainbow(text: str) -> str:
+    # rainbow() as it was before the run-length rewrite, kept as the benchmark baseline
+    colors = list(ConsoleStencil.VALID_COLORS)
+    return ''.join(ConsoleStencil.colorize(char, colors[i % len(colors)]) for i, char in enumerate(text))
+
+def rainbow_benchmark():
+    banner = [f'{ "#" * 20 } console menus { "#" * 20 }  line { i }' for i in range(200)]
+    print(ConsoleStencil.gradient(banner[:8], band=4))
+    runs = 20
+    legacy = timeit.timeit(lambda: '\n'.join(legacy_rainbow(line) for line in banner), number=runs)
+    bulk = timeit.timeit(lambda: ConsoleStencil.gradient(banner, band=4), number=runs)
+    legacy_size = len('\n'.join(legacy_rainbow(line) for line in banner))
+    bulk_size = len(ConsoleStencil.gradient(banner, band=4))
+    print(f'legacy rainbow : { legacy / runs * 1000:.2f}ms { legacy_size } chars')
+    print(f'gradient       : { bulk / runs * 1000:.2f}ms { bulk_size } chars ({ legacy / bulk:.1f}x)')
+    
     
+def test_tabs_reach_the_next_tab_stop():
+    assert ConsoleStencil.visible_width('a\tb') == 9
+    assert ConsoleStencil.visible_width('\t') == ConsoleStencil.TAB_SIZE
+    assert ConsoleStencil.visible_width(ConsoleStencil.compile(padded=False, fg_color='red')('ab\tc')) == 9
+    assert ConsoleStencil.sanitize('日\tx') == '日      x'
+
+def test_control_characters_take_no_columns():
+    assert ConsoleStencil.visible_width('a\rb\x07') == 2
+    assert ConsoleStencil.sanitize('a\rb\x07') == 'ab'
+
+def test_truncate_tabs_fits_the_width():
+    truncated = ConsoleStencil.truncate('x\t' * 30, 20)
+    assert '\t' not in truncated
+    assert ConsoleStencil.visible_width(truncated) <= 20
+    assert truncated == 'x       x       x  …'
+
+def test_pad_and_slice_tabs():
+    assert ConsoleStencil.pad('a\tb', 12) == 'a       b   '
+    assert ConsoleStencil.slice_columns('a\tb', 4, 6) == '    b'
+    assert ConsoleStencil.slice_columns('日\t本', 7, 4) == ' 本'
+
+
+def test_keyword_highlighter_non_ascii_case_pairs():
+    red = ConsoleStencil.compile(padded=False, fg_color='red')
+    green = ConsoleStencil.compile(padded=False, fg_color='green')
+    dotless = KeywordHighlighter({'I': red, 'ı': green}, ignore_case=True)
+    assert dotless('I ı i') == f"{ red('I') } { red('ı') } { red('i') }"
+    dotted = KeywordHighlighter({'i': red, 'İ': green}, ignore_case=True)
+    assert dotted('İ i') == f"{ red('İ') } { red('i') }"
+    sharp = KeywordHighlighter({'ß': green}, ignore_case=True)
+    assert sharp('ẞ ß') == f"{ green('ẞ') } { green('ß') }"
+
+def test_keyword_highlighter_longest_phrase_wins():
+    highlighter = KeywordHighlighter({'err': {'fg_color': 'red'}, 'error': {'fg_color': 'yellow'}})
+    yellow = ConsoleStencil.compile(padded=False, fg_color='yellow')
+    assert highlighter('an error') == f"an { yellow('error') }"
+
+
+def stream_colors(patterns, text: str) -> str:
+    return ''.join(ConsoleStencil.color_regex_stream(io.StringIO(text), patterns, chunk_size=8))
+
+def test_regex_stream_global_inline_flags():
+    red = ConsoleStencil.compile(padded=False, fg_color='red')
+    green = ConsoleStencil.compile(padded=False, fg_color='green')
+    colored = stream_colors([(re.compile('(?i)error'), 'red'), (r'\d+', 'green')], 'ERROR 12\nerror\n')
+    assert colored == f"{ red('ERROR') } { green('12') }\n{ red('error') }\n"
+
+def test_regex_stream_patterns_that_cant_be_combined():
+    red = ConsoleStencil.compile(padded=False, fg_color='red')
+    green = ConsoleStencil.compile(padded=False, fg_color='green')
+    # the same group name twice
+    assert stream_colors([(r'(?P<c>a)', 'red'), (r'(?P<c>b)', 'green')], 'ab\n') == f"{ red('a') }{ green('b') }\n"
+    # a numbered backreference keeps matching its own group
+    colored = stream_colors([(r'(x)y', 'green'), (r'(\w)\1', 'red')], 'xy aa ab\n')
+    assert colored == f"{ green('xy') } { red('aa') } ab\n"
+
+def test_regex_stream_separate_scan_with_empty_matches():
+    patterns = [(r'(\w)\1', 'red'), (r'\d*', 'green')]
+    combined = re.compile(r'(\w)\1|\d*')
+    red = ConsoleStencil.compile(padded=False, fg_color='red')
+    green = ConsoleStencil.compile(padded=False, fg_color='green')
+    expected = combined.sub(lambda match: (red if match.group(1) else green)(match.group()), 'aa b1\n')
+    assert stream_colors(patterns, 'aa b1\n') == expected
+
+
 def run_test(test_name, method_calls):
     print('Running Test for ' + test_name)
     method_calls()
@@ -66,4 +179,6 @@ if __name__ == '__main__':
     # run_test('Color Methods', color_methods)
     # run_test('Font Variants', font_vars)
     # run_test('Multi Style', multi_style)
+    # run_test('Compile Benchmark', compile_benchmark)
+    # run_test('Rainbow Benchmark', rainbow_benchmark)
     # input()
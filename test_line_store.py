@@ -0,0 +1,40 @@
+import os
+import re
+from array import array
+from line_store import LineIndexCache, LineSearch, MappedLineStore, ParallelLineSearch
+
+
+def test_parallel_search_finds_the_same_lines_in_utf8(tmp_path, monkeypatch):
+    lines = [f'{ idx } { word }' for idx, word in enumerate(['ab', 'a€b', 'äöüßé', 'plain', 'x\ty', '', 'über'] * 200)]
+    path = tmp_path / 'lines.txt'
+    path.write_bytes('\n'.join(lines).encode('utf-8') + b'\n')
+    monkeypatch.setattr(ParallelLineSearch, 'RANGE_SIZE', 512)
+    with MappedLineStore(str(path), use_cache=False) as store:
+        store.wait()
+        for pattern in (r'a.b', r'\w{5}', r'^$', r'\bber', r'y$'):
+            expected = [idx for idx, line in enumerate(store) if re.search(pattern, line)]
+            search = ParallelLineSearch(store, pattern, workers=2)
+            search.wait()
+            assert search.matches == expected, pattern
+            single = LineSearch(store, pattern)
+            single.wait()
+            assert single.matches == expected, pattern
+
+
+def test_index_cache_evicts_the_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(LineIndexCache, 'MIN_SIZE', 0)
+    cache = LineIndexCache(str(tmp_path / 'cache'), max_size=2 * (LineIndexCache.HEADER.size + 8 * 100))
+    offsets = array('Q', range(100))
+    paths = []
+    for idx in range(3):
+        path = tmp_path / f'file{ idx }.txt'
+        path.write_bytes(b'line\n' * 10)
+        paths.append(str(path))
+        stat = os.stat(path)
+        cache.save(paths[-1], stat, path.read_bytes(), offsets, stat.st_size)
+        # mtimes of files written back to back can be equal
+        os.utime(cache.path_for(paths[-1]), ns=(idx * 10**9, idx * 10**9))
+        if idx == 1:
+            assert cache.load(paths[0], os.stat(paths[0]), b'') is not None
+    kept = [os.path.exists(cache.path_for(path)) for path in paths]
+    assert kept == [True, False, True]
@@ -0,0 +1,60 @@
+import heapq
+import random
+import string
+from option_filter import FuzzyMatcher
+
+
+def brute_force(options: list[str], query: str, limit: int) -> list[tuple[str, tuple[int, ...]]]:
+    # every option holding the query as a subsequence, scored one by one
+    scored = []
+    for idx, option in enumerate(options):
+        text = option.lower()
+        pos = -1
+        for char in query:
+            pos = text.find(char, pos + 1)
+            if pos < 0:
+                break
+        else:
+            score, positions = FuzzyMatcher.score(text, query)
+            scored.append((score, -idx, tuple(positions)))
+    return [(options[-neg_idx], positions) for _, neg_idx, positions in heapq.nlargest(limit, scored)]
+
+
+def assert_matches_brute_force(options: list[str], query: str, limit: int = FuzzyMatcher.LIMIT) -> None:
+    view = FuzzyMatcher(options, limit=limit).search(query)
+    assert list(zip(view, view.positions)) == brute_force(options, query, limit)
+
+
+def test_fuzzy_best_match_is_not_dropped():
+    options = ['xx#####a'] * 2000 + ['apple']
+    view = FuzzyMatcher(options).search('a')
+    assert view[0] == 'apple'
+    assert_matches_brute_force(options, 'a')
+
+
+def test_fuzzy_wide_first_match_still_ranks():
+    options = [f'a{ "z" * 30 }ab'] + [f'{ "q" * 5 }a{ "q" * 3 }b' for _ in range(2000)]
+    view = FuzzyMatcher(options).search('ab')
+    assert view[0] == options[0]
+    assert_matches_brute_force(options, 'ab')
+
+
+def test_fuzzy_top_results_match_brute_force():
+    rng = random.Random(7)
+    alphabet = string.ascii_lowercase[:8] + ' _-'
+    options = [''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 24))) for _ in range(5000)]
+    matcher = FuzzyMatcher(options, limit=50)
+    for query in ('a', 'ab', 'abc', 'abca', 'h_', 'ba', 'b'):
+        view = matcher.search(query)
+        assert list(zip(view, view.positions)) == brute_force(options, query, 50), query
+
+
+def test_fuzzy_pruned_results_match_brute_force():
+    rng = random.Random(11)
+    alphabet = 'abc _-/'
+    options = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20))) for _ in range(3000)]
+    matcher = FuzzyMatcher(options, limit=5)
+    for query in ('a', '_', ' ', 'ab', 'a_b', '-a', 'ab-', 'abb', 'b/c', 'cab'):
+        view = matcher.search(query)
+        assert list(zip(view, view.positions)) == brute_force(options, query, 5), query
+        assert view.total == sum(1 for option in options if brute_force([option], query, 1)), query
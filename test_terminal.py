@@ -0,0 +1,80 @@
+import io
+import os
+import terminal
+from basic_menus import VerticalMenu
+from terminal import ALT_SCREEN_OFF, SHOW_CURSOR, FrameRenderer, KeyEvent, KeyInput, TerminalSession, move_cursor
+from text_viewer import ConsoleTextViewer, Option
+
+
+class ScriptedInput(KeyInput):
+    '''
+        Replays the key names passed one frame at a time, running out of
+        keys fails the test instead of blocking forever.
+    '''
+    def __init__(self, names: list[str]) -> None:
+        super().__init__()
+        self.names: list[str] = list(names)
+
+    def read_keys(self, timeout: float = None) -> list[KeyEvent]:
+        if timeout is not None:
+            return []
+        if not self.names:
+            raise AssertionError('the widget asked for more keys than were scripted')
+        return [KeyEvent(self.names.pop(0))]
+
+
+def test_menu_opened_from_viewer_nests_in_its_session():
+    stream = io.StringIO()
+    session = TerminalSession(stream)
+    chosen, inner_exit = [], []
+
+    def pick(viewer: ConsoleTextViewer) -> None:
+        menu = VerticalMenu(['one', 'two'], 'Pick', session=session)
+        menu.key_input = ScriptedInput(['down', 'enter'])
+        chosen.append(menu.run())
+        inner_exit.append((session.active, stream.getvalue()))
+
+    viewer = ConsoleTextViewer('first line\nsecond line', [Option('Pick', pick), Option('Exit', ConsoleTextViewer.exit)], session)
+    viewer.key_input = ScriptedInput(['enter', 'right', 'enter'])
+    viewer.run()
+
+    assert chosen == ['two']
+    still_active, written = inner_exit[0]
+    assert still_active
+    assert ALT_SCREEN_OFF not in written and SHOW_CURSOR not in written
+    assert stream.getvalue().count(ALT_SCREEN_OFF) == 1
+    assert not session.active
+    # the viewer repainted itself over the menu before exiting
+    assert 'first line' in stream.getvalue()[len(written):]
+
+
+def test_outer_renderer_repaints_after_inner_renderer():
+    stream = io.StringIO()
+    session = TerminalSession(stream)
+    outer, inner = FrameRenderer(session), FrameRenderer(session)
+    with session:
+        outer.render(['outer row'])
+        with session:
+            inner.render(['inner row'])
+        written = len(stream.getvalue())
+        outer.render(['outer row'])
+    assert 'outer row' in stream.getvalue()[written:]
+
+
+def test_widgets_share_the_default_session():
+    menu = VerticalMenu(['one'], 'Pick')
+    viewer = ConsoleTextViewer('text', [])
+    assert menu.session is viewer.session is menu.screen.session
+
+
+def test_frame_is_clipped_to_the_terminal_height(monkeypatch):
+    monkeypatch.setattr(terminal, 'terminal_size', lambda: os.terminal_size((20, 4)))
+    stream = io.StringIO()
+    session = TerminalSession(stream)
+    with session:
+        renderer = FrameRenderer(session)
+        renderer.render([f'row { idx }' for idx in range(10)])
+    written = stream.getvalue()
+    assert renderer.last_frame == ['row 0', 'row 1', 'row 2']
+    assert 'row 3' not in written
+    assert move_cursor(5) not in written and move_cursor(4) in written
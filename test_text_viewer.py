@@ -0,0 +1,84 @@
+import asyncio
+import contextlib
+import io
+from colorify import ConsoleStencil
+from terminal import KeyEvent, TerminalSession
+from test_terminal import ScriptedInput
+from text_viewer import ConsoleTextViewer, Option, WrapIndex
+
+
+def wrapped_rows(lines: list[str], width: int) -> list[str]:
+    index = WrapIndex(lines)
+    index.set_width(width)
+    return [ConsoleStencil.slice_columns(lines[line], column, width) for line, column in index.window(0, 0, 100)]
+
+
+def test_wide_character_at_the_edge_moves_to_the_next_row():
+    rows = wrapped_rows(['a' * 38 + '漢字'], 39)
+    assert rows == ['a' * 38 + ' ', '漢字']
+
+
+def test_tabs_are_expanded_before_wrapping():
+    rows = wrapped_rows(['a\tb\tc'], 10)
+    assert rows == ['a       b ', '      c']
+    assert all(ConsoleStencil.visible_width(row) <= 10 for row in rows)
+
+
+class SuspendingInput(ScriptedInput):
+    '''
+        Scripted keys that are also delivered to run_async(), 
+        suspended records whether the terminal is in its normal mode.
+    '''
+    def __init__(self, names: list[str]) -> None:
+        super().__init__(names)
+        self.suspended_now: bool = False
+
+    async def read_keys_async(self, timeout: float = None) -> list[KeyEvent]:
+        return self.read_keys(timeout)
+
+    @contextlib.contextmanager
+    def suspended(self):
+        self.suspended_now = True
+        try:
+            yield
+        finally:
+            self.suspended_now = False
+
+
+def test_async_action_runs_while_the_terminal_is_suspended():
+    seen = []
+
+    async def prompt(viewer: ConsoleTextViewer) -> None:
+        await asyncio.sleep(0)
+        seen.append(viewer.key_input.suspended_now)
+        viewer.exit()
+
+    viewer = ConsoleTextViewer('text', [Option('Prompt', prompt)], TerminalSession(io.StringIO()))
+    viewer.key_input = SuspendingInput(['enter'])
+    asyncio.run(viewer.run_async())
+    assert seen == [True]
+    assert not viewer.key_input.suspended_now
+
+
+def test_following_from_another_line_updates_the_unfinished_last_line(tmp_path):
+    path = tmp_path / 'log.txt'
+    path.write_text('first\nsecond\npart')
+    viewer = ConsoleTextViewer.from_path(str(path), [], session=TerminalSession(io.StringIO()))
+    viewer.text_lines.wait()
+    assert 'part' in viewer.show_text()
+    with open(path, 'a') as log:
+        log.write('ial line\n')
+    # 'f' pressed on the first line
+    viewer.follow = True
+    viewer._poll()
+    assert 'partial line' in viewer.show_text()
+    viewer.close()
+
+
+def test_viewer_closes_the_file_it_opened(tmp_path):
+    path = tmp_path / 'text.txt'
+    path.write_text('one\ntwo')
+    viewer = ConsoleTextViewer.from_path(str(path), [Option('Exit', ConsoleTextViewer.exit)], session=TerminalSession(io.StringIO()))
+    viewer.key_input = ScriptedInput(['enter'])
+    viewer.run()
+    assert viewer.text_lines.file.closed
@@ -1,7 +1,14 @@
-import os
-import keyboard
+import sys
+import asyncio
+import inspect
+import re
+from collections import OrderedDict
+from collections.abc import Sequence
 from colorify import ConsoleStencil
-from colorama import Fore, Back
+from colorama import Fore, Back, Style, init
+from line_store import LineSearch, MappedLineStore
+from terminal import FrameClock, FrameRenderer, KeyInput, TerminalSession, default_input
+from terminal import KEY_RESIZE, SESSION, terminal_size
 
 # WORK IN PROGRESS
 init(autoreset=True)
@@ -11,66 +18,485 @@ class Option:
         self.title = title
         self.action = action
         
+class WrapIndex:
+    '''
+        Maps the display rows of soft-wrapped text to (line, column offset).
+
+        The columns each line breaks at are worked out lazily for the lines 
+        around the visible window, so scrolling through a file of long lines 
+        costs O(visible rows). Tabs are expanded before a line is measured and
+        a wide character that doesn't fit at the end of a row starts the next 
+        one. The breaks are kept per width (a few recent widths) so switching 
+        back to a previous width is free.
+
+        CACHE_LINES: int: The number of lines whose breaks are kept per width.
+    '''
+    CACHE_LINES: int = 65536
+    CACHED_WIDTHS: int = 4
+
+    def __init__(self, lines) -> None:
+        self.lines = lines
+        self.width: int = 1
+        self.widths: OrderedDict[int, OrderedDict[int, Sequence[int]]] = OrderedDict()
+        self.breaks: OrderedDict[int, Sequence[int]] = OrderedDict()
+
+    def set_width(self, width: int) -> None:
+        width = max(1, width)
+        if width == self.width and self.widths:
+            return
+        self.width = width
+        if width not in self.widths:
+            self.widths[width] = OrderedDict()
+            if len(self.widths) > WrapIndex.CACHED_WIDTHS:
+                self.widths.popitem(last=False)
+        self.widths.move_to_end(width)
+        self.breaks = self.widths[width]
+
+    def invalidate(self, line: int = None) -> None:
+        '''
+            Forgets the breaks of the line passed (a line that was
+            appended to) or of every line when None.
+        '''
+        if line is None:
+            self.widths.clear()
+            self.breaks = self.widths.setdefault(self.width, OrderedDict())
+        else:
+            for breaks in self.widths.values():
+                breaks.pop(line, None)
+
+    @staticmethod
+    def wrap_columns(text: str, width: int) -> Sequence[int]:
+        '''
+            Returns the display column each wrapped row of the text starts at.
+        '''
+        text = ConsoleStencil.sanitize(text)
+        if text.isascii():
+            return range(0, max(1, len(text)), width)
+
+        breaks, row_start, column = [0], 0, 0
+        for char in text:
+            char_width = ConsoleStencil.char_width(char)
+            if column + char_width > row_start + width and column > row_start:
+                breaks.append(column)
+                row_start = column
+            column += char_width
+        return breaks
+
+    def line_breaks(self, line: int) -> Sequence[int]:
+        breaks = self.breaks.get(line)
+        if breaks is None:
+            breaks = WrapIndex.wrap_columns(self.lines[line], self.width)
+            self.breaks[line] = breaks
+            if len(self.breaks) > WrapIndex.CACHE_LINES:
+                self.breaks.popitem(last=False)
+        return breaks
+
+    def rows(self, line: int) -> int:
+        return len(self.line_breaks(line))
+
+    def rewind(self, line: int, rows: int) -> tuple[int, int]:
+        '''
+            Returns the (line, wrapped row) that is the number of display 
+            rows passed above the first row of line.
+        '''
+        while rows > 0 and line > 0:
+            line -= 1
+            count = self.rows(line)
+            if count > rows:
+                return line, count - rows
+            rows -= count
+        return line, 0
+
+    def window(self, line: int, row: int, rows: int) -> list[tuple[int, int]]:
+        '''
+            Returns the (line, column offset) of the display rows passed 
+            starting at the wrapped row of line.
+        '''
+        window = []
+        while len(window) < rows and line < len(self.lines):
+            breaks = self.line_breaks(line)
+            for wrapped in range(row, len(breaks)):
+                window.append((line, breaks[wrapped]))
+                if len(window) == rows:
+                    break
+            line, row = line + 1, 0
+        return window
+
+
 class ConsoleTextViewer:
-    def __init__(self, text, menu_options) -> None:
-        self.text_lines = text.split('\n')
+    # how often the screen is refreshed while a file is being indexed
+    REFRESH_INTERVAL: float = 0.1
+
+    # how often a followed file is checked for new lines, which also caps the redraw rate
+    FOLLOW_INTERVAL: float = 0.1
+
+    # rendered rows kept, keyed by (line, column, rules version, width, selected)
+    RENDER_CACHE_SIZE: int = 1024
+
+    def __init__(self, text, menu_options, session: TerminalSession = None) -> None:
+        '''
+            text is a string or a sequence of lines such as a MappedLineStore, the
+            viewer shares the terminal SESSION with the menus unless a session is passed.
+        '''
+        self.text_lines = text.split('\n') if isinstance(text, str) else text
+        # a store opened by from_path() is closed with the viewer
+        self.owns_lines: bool = False
         self.menu_options = menu_options
+        self.session = session if session else SESSION
+        self.screen = FrameRenderer(self.session)
+        self.key_input: KeyInput = default_input()
+        self.frame_clock = FrameClock()
         self._setup_menu()
     
+    @classmethod
+    def from_path(cls, path: str, menu_options, encoding: str = 'utf-8', follow: bool = False, 
+    session: TerminalSession = None) -> 'ConsoleTextViewer':
+        '''
+            Opens a file through a memory map, the viewer is usable right away 
+            while the lines are indexed in the background and only the lines 
+            on screen are ever decoded.
+
+            With follow set the view stays pinned to the end of the file and shows
+            lines as they are appended (like tail -f), 'f' toggles following.
+
+            The file is closed when the viewer exits, or by close() when it is 
+            never run.
+        '''
+        viewer = cls(MappedLineStore(path, encoding), menu_options, session)
+        viewer.owns_lines = True
+        viewer.follow = follow
+        return viewer
+
+    def close(self) -> None:
+        '''
+            Stops a running search and closes the file opened by from_path(),
+            the lines can't be read afterwards.
+        '''
+        if self.search:
+            self.search.cancel()
+            self.search.wait()
+        if self.owns_lines:
+            self.text_lines.close()
+            self.owns_lines = False
+
+    @property
+    def indexing(self) -> bool:
+        return getattr(self.text_lines, 'indexing', False)
+
+    @property
+    def can_follow(self) -> bool:
+        return hasattr(self.text_lines, 'refresh')
+
+    def refresh_timeout(self) -> float:
+        if self.follow:
+            return ConsoleTextViewer.FOLLOW_INTERVAL
+        searching = self.search is not None and self.search.running
+        return ConsoleTextViewer.REFRESH_INTERVAL if self.indexing or searching else None
+
+    def start_search(self, pattern: str) -> None:
+        '''
+            Searches the text for the regex pattern in the background and jumps
+            to the first match after the current line once it is found.
+        '''
+        if self.search:
+            self.search.cancel()
+        self.search = None
+        self.search_error = ''
+        self.rules_version += 1
+        try:
+            self.search = LineSearch.create(self.text_lines, pattern)
+        except re.error as error:
+            self.search_error = str(error)
+            return
+        self.pending_jump = True
+
+    def jump_to_match(self, forward: bool = True) -> None:
+        if not self.search:
+            return
+        if forward:
+            line = self.search.next_match(self.text_index)
+        else:
+            line = self.search.previous_match(self.text_index)
+        if line is not None:
+            self.follow = False
+            self.text_index = line
+
+    def _poll(self) -> None:
+        '''
+            Jumps to the first search result once it is found, picks up lines 
+            appended to a followed file and keeps the view pinned to the last line.
+        '''
+        if self.pending_jump and self.search:
+            # the first match at or after the current line
+            line = self.search.next_match(self.text_index - 1)
+            if line is not None:
+                self.follow = False
+                self.text_index = line
+            if line is not None or not self.search.running:
+                self.pending_jump = False
+        if not self.follow:
+            return
+        # following may have just been turned on away from the last line
+        last = max(0, len(self.text_lines) - 1)
+        status = self.text_lines.refresh()
+        if status in (MappedLineStore.TRUNCATED, MappedLineStore.ROTATED):
+            # the lines on screen are gone, there is nothing to scroll
+            self.first_line = None
+            self.wrap_index.invalidate()
+            self.render_cache.clear()
+        elif status == MappedLineStore.GROWN:
+            # the last line may have been unfinished
+            self.wrap_index.invalidate(last)
+            self.forget_rendered(last)
+        self.text_index = max(0, len(self.text_lines) - 1)
+
     def _setup_menu(self) -> None:
         self.text_index = 0
         self.menu_index = 0
         self.running = True
-        self.term_height = os.get_terminal_size().lines
-        self.term_width = os.get_terminal_size().columns
+        self.follow = False
+        self.first_line = None
+        self.search: LineSearch = None
+        self.search_input: str = None
+        self.search_error = ''
+        self.pending_jump = False
+        self.wrap = False
+        self.column = 0
+        self.wrap_index: WrapIndex = WrapIndex(self.text_lines)
+        self.render_cache: OrderedDict[tuple, str] = OrderedDict()
+        self.rules_version: int = 0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.term_width, self.term_height = terminal_size()
+
+    def on_resize(self) -> None:
+        '''
+            Lays the viewer out for the new terminal size, the wrap index
+            keeps a row count cache per width so nothing else is stale.
+        '''
+        self.term_width, self.term_height = terminal_size()
+        self.first_line = None
+        self.screen.invalidate()
 
     def clear(self) -> None:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.session.clear()
 
-    def show_text(self) -> None:
-        max_lines = self.term_height - 3  
-        start_line = max(0, self.text_index - (max_lines // 2))
-        end_line = min(len(self.text_lines), start_line + max_lines)
+    @property
+    def text_rows(self) -> int:
+        return self.term_height - 3
 
-        for idx in range(start_line, end_line):
-            line = self.text_lines[idx]
-            if idx == self.text_index:
-                print(f"{Back.WHITE}{Fore.BLACK}>{line}{Style.RESET_ALL}")
-            else:
-                print(line)
+    @property
+    def text_width(self) -> int:
+        # one column is taken by the '>' marking the current line
+        return max(1, self.term_width - 1)
 
-        
-        for _ in range(end_line, start_line + max_lines):
-            print()
+    def _start_line(self) -> int:
+        '''
+            The first line on screen, the current line is centered 
+            unless following where the last line is at the bottom.
+        '''
+        if self.follow:
+            return max(0, len(self.text_lines) - self.text_rows)
+        return max(0, self.text_index - (self.text_rows // 2))
+
+    def _display_rows(self) -> list[tuple[int, int]]:
+        '''
+            The (line, column offset) shown on each text row. Lines are cut at
+            the screen width (scrolled by column) or soft-wrapped, so a long 
+            line never spills into the rows below.
+        '''
+        max_lines = self.text_rows
+        if not self.wrap:
+            start_line = self._start_line()
+            end_line = min(len(self.text_lines), start_line + max_lines)
+            return [(idx, self.column) for idx in range(start_line, end_line)]
 
-    def show_menu(self) -> None:
-        print("\n" + "=" * self.term_width)  # Separator line
+        self.wrap_index.set_width(self.text_width)
+        if self.follow and self.text_lines:
+            last = len(self.text_lines) - 1
+            line, row = self.wrap_index.rewind(last, max_lines - self.wrap_index.rows(last))
+        else:
+            line, row = self.wrap_index.rewind(self.text_index, max_lines // 2)
+        return self.wrap_index.window(line, row, max_lines)
+
+    def render_row(self, idx: int, column: int, width: int) -> str:
+        '''
+            Returns the styled row showing line idx from column, rows are 
+            cached so scrolling only formats the rows that became visible 
+            and the two rows whose selection changed.
+        '''
+        is_selected = idx == self.text_index
+        key = (idx, column, self.rules_version, width, is_selected)
+        row = self.render_cache.get(key)
+        if row is not None:
+            self.cache_hits += 1
+            self.render_cache.move_to_end(key)
+            return row
+
+        self.cache_misses += 1
+        line = ConsoleStencil.slice_columns(self.text_lines[idx], column, width)
+        if self.search:
+            # only the lines on screen are highlighted
+            line = ConsoleStencil.color_regex_matches(line, self.search.pattern, 'yellow')
+        row = f"{Back.WHITE}{Fore.BLACK}>{line}{Style.RESET_ALL}" if is_selected else line
+        self.render_cache[key] = row
+        if len(self.render_cache) > ConsoleTextViewer.RENDER_CACHE_SIZE:
+            self.render_cache.popitem(last=False)
+        return row
+
+    def forget_rendered(self, idx: int) -> None:
+        '''
+            Drops the cached rows of a line whose text changed.
+        '''
+        for key in [key for key in self.render_cache if key[0] == idx]:
+            del self.render_cache[key]
+
+    def render_cache_info(self) -> dict[str, int]:
+        return {
+            'hits': self.cache_hits, 'misses': self.cache_misses, 
+            'size': len(self.render_cache), 'max_size': ConsoleTextViewer.RENDER_CACHE_SIZE
+        }
+
+    def show_text(self) -> list[str]:
+        width = self.text_width
+        rows = [self.render_row(idx, column, width) for idx, column in self._display_rows()]
+        for _ in range(len(rows), self.text_rows):
+            rows.append('')
+        return rows
+
+    def show_menu(self) -> list[str]:
+        options = []
         for idx, option in enumerate(self.menu_options):
             if idx == self.menu_index:
-                print(f"{ Back.WHITE }{ Fore.BLACK } { option.title } { Style.RESET_ALL }", end="    ")
+                options.append(f"{ Back.WHITE }{ Fore.BLACK } { option.title } { Style.RESET_ALL }")
             else:
-                print(f" { option.title } ", end="    ")
-        print()
+                options.append(f" { option.title } ")
+        status = f"    [ indexing { format(self.text_lines.progress, '.0%') } ]" if self.indexing else ''
+        if self.follow:
+            status = f"{ status }    [ following ]"
+        if self.wrap:
+            status = f"{ status }    [ wrap ]"
+        elif self.column:
+            status = f"{ status }    [ column { self.column + 1 } ]"
+        status = f"{ status }{ self.search_status() }"
+        return ['', "=" * self.term_width, "    ".join(options) + status]  # Separator line
+
+    def search_status(self) -> str:
+        if self.search_input is not None:
+            return f"    [ /{ self.search_input }_ ]"
+        if self.search_error:
+            return f"    [ invalid pattern: { self.search_error } ]"
+        if not self.search:
+            return ''
+        if self.search.running:
+            return f"    [ /{ self.search.pattern.pattern } { len(self.search.matches) } matches, { format(self.search.progress, '.0%') } | Esc cancels ]"
+        cancelled = ' (cancelled)' if self.search.cancelled else ''
+        return f"    [ /{ self.search.pattern.pattern } { len(self.search.matches) } matches{ cancelled } | n / N ]"
+
+    def show(self) -> None:
+        start_line = self._start_line()
+        if self.follow and self.first_line is not None and not self.wrap:
+            # lines appended to a followed file move the text up, scrolling the 
+            # terminal leaves only the new rows at the bottom to be written
+            self.screen.scroll(1, self.text_rows, start_line - self.first_line)
+        self.first_line = start_line
+        self.screen.render(self.show_text() + self.show_menu())
 
     def run(self):
-        self.clear()
-        while self.running:
-            self.show_text()
-            self.show_menu()
-
-            event = keyboard.read_event()
-            if event.event_type != keyboard.KEY_DOWN:
-                continue
-            
-            self._handle_keys(event)
-            self.clear()
-
-    def _handle_keys(self, key) -> None:
-        if key.name == 'up':
-            self.text_index = (self.text_index - 1) % len(self.text_lines)
+        try:
+            with self.session, self.key_input:
+                while self.running:
+                    self._poll()
+                    self.show()
+                    self.frame_clock.tick()
+                    # keys that arrived during the last frame are applied before drawing the next
+                    for key in self.key_input.read_batch(self.frame_clock, self.refresh_timeout()):
+                        self._handle_keys(key)
+                        if not self.running:
+                            break
+        finally:
+            self.close()
+
+    async def run_async(self, timeout: float = None) -> None:
+        '''
+            Awaitable version of run(), menu actions may be coroutine functions
+            and are awaited. Raises asyncio.TimeoutError when timeout (seconds)
+            runs out before the viewer is closed.
+        '''
+        await asyncio.wait_for(self._run_async(), timeout)
+
+    async def _run_async(self) -> None:
+        try:
+            with self.session, self.key_input:
+                while self.running:
+                    self._poll()
+                    self.show()
+                    self.frame_clock.tick()
+                    for key in await self.key_input.read_batch_async(self.frame_clock, self.refresh_timeout()):
+                        await self._handle_keys_async(key)
+                        if not self.running:
+                            break
+        finally:
+            self.close()
+
+    def _handle_search_key(self, key) -> None:
+        if key.name == 'enter':
+            if self.search_input:
+                self.start_search(self.search_input)
+            self.search_input = None
+
+        elif key.name == 'esc':
+            self.search_input = None
+
+        elif key.name == 'backspace':
+            self.search_input = self.search_input[:-1]
+
+        elif key.name == 'space':
+            self.search_input = f'{ self.search_input } '
+
+        elif len(key.name) == 1:
+            self.search_input = f'{ self.search_input }{ key.name }'
+
+    def _handle_keys(self, key):
+        if key.name == KEY_RESIZE:
+            return self.on_resize()
+
+        if self.search_input is not None:
+            return self._handle_search_key(key)
+
+        if key.name == '/':
+            self.search_input = ''
+
+        elif key.name == 'n':
+            self.jump_to_match()
+
+        elif key.name == 'N':
+            self.jump_to_match(forward=False)
+
+        elif key.name == 'esc' and self.search and self.search.running:
+            self.search.cancel()
+
+        elif key.name == 'up':
+            self.follow = False
+            self.text_index = (self.text_index - 1) % max(1, len(self.text_lines))
 
         elif key.name == 'down':
-            self.text_index = (self.text_index + 1) % len(self.text_lines)
+            self.follow = False
+            self.text_index = (self.text_index + 1) % max(1, len(self.text_lines))
+
+        elif key.name == 'f' and self.can_follow:
+            self.follow = not self.follow
+            self.first_line = None
+
+        elif key.name == 'w':
+            self.wrap = not self.wrap
+            self.column = 0
+
+        elif key.name == 'h' and not self.wrap:
+            self.column = max(0, self.column - self.text_width // 2)
+
+        elif key.name == 'l' and not self.wrap:
+            self.column += self.text_width // 2
                     
         elif key.name == 'left':
             self.menu_index = (self.menu_index - 1) % len(self.menu_options)
@@ -79,7 +505,31 @@ class ConsoleTextViewer:
             self.menu_index = (self.menu_index + 1) % len(self.menu_options)
                     
         elif key.name == 'enter':
-            self.menu_options[self.menu_index].action(self)
+            return self._run_action()
+
+    async def _handle_keys_async(self, key) -> None:
+        '''
+            _handle_keys() for run_async(), an awaitable returned by the
+            selected action is awaited before the terminal is restored.
+        '''
+        if key.name == 'enter' and self.search_input is None:
+            await self._run_action_async()
+        else:
+            self._handle_keys(key)
+
+    def _run_action(self):
+        # actions may print and call input() so the terminal is back in its normal mode
+        with self.key_input.suspended():
+            result = self.menu_options[self.menu_index].action(self)
+        self.screen.invalidate()
+        return result
+
+    async def _run_action_async(self) -> None:
+        with self.key_input.suspended():
+            result = self.menu_options[self.menu_index].action(self)
+            if inspect.isawaitable(result):
+                await result
+        self.screen.invalidate()
 
     def exit(self):
         self.running = False
@@ -258,5 +708,9 @@ Suspendisse vel elit ut nunc scelerisque ullamcorper in eget justo."""
         Option("Exit", lambda viewer: viewer.exit())
     ]
 
-    viewer = ConsoleTextViewer(sample_text, horizontal_options)
+    # python text_viewer.py <path> views a file instead of the demo text
+    if len(sys.argv) > 1:
+        viewer = ConsoleTextViewer.from_path(sys.argv[1], horizontal_options)
+    else:
+        viewer = ConsoleTextViewer(sample_text, horizontal_options)
     viewer.run()